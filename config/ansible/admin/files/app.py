@@ -15,6 +15,8 @@ Node Allocations:
 DHCP Leases:
 - /cluster/dhcp/leases/{lease_key} -> lease JSON
   * lease JSON contains: ip, mac (non-normalized with colons, e.g., "58:47:ca:ab:cd:ef")
+- /cluster/dhcp/by-ip/{ip} -> non-normalized MAC of the lease last given that IP
+  * written with the lease by the DHCP server; may be stale, so check the lease
 
 Leadership:
 - /cluster/leader/app -> hostname of current storage leader
@@ -36,27 +38,48 @@ MAC Address Formats:
 - Non-normalized: with colons (58:47:ca:ab:cd:ef) - used in DHCP leases and network tools
 """
 
+import errno
 import functools
-import json
+import heapq
 import re
 import sys
 
-from flask import Flask, request, jsonify, redirect, render_template, send_from_directory, send_file
+from flask import Flask, Response, request, jsonify, redirect, render_template, send_file
 import os
+import queue
 import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout, wait
 import time
 import subprocess
+import selectors
 import socket
 import platform
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime, timedelta, UTC
 import dns.resolver
 from cryptography import x509
 from cryptography.hazmat.backends import default_backend
-from jinja2 import Template
+from jinja2 import Environment, FileSystemLoader
 
-from ycluster.common.etcd_utils import get_etcd_client
+try:
+    from pystemd.dbuslib import DBus as SystemdBus
+    from pystemd.systemd1 import Unit as SystemdUnit
+except ImportError:  # fall back to systemctl until python3-pystemd is deployed
+    SystemdBus = SystemdUnit = None
 
+try:
+    from pyroute2 import IPRoute
+except ImportError:  # fall back to `ip neigh` until python3-pyroute2 is deployed
+    IPRoute = None
+
+import grpc
+from etcd3.events import DeleteEvent
+from etcd3.exceptions import Etcd3Exception
+from ycluster.common.etcd_utils import EtcdPool, get_many
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), 'templates')
 AUTOINSTALL_USER_DATA_TEMPLATE = os.path.join(os.path.dirname(__file__), 'templates', 'user-data.j2')
 MACOS_BOOTSTRAP_TEMPLATE = os.path.join(os.path.dirname(__file__), 'templates', 'macos-bootstrap.sh.j2')
 NAS_BOOTSTRAP_TEMPLATE = os.path.join(os.path.dirname(__file__), 'templates', 'nas-bootstrap.sh.j2')
@@ -64,8 +87,86 @@ NVIDIA_BOOTSTRAP_TEMPLATE = os.path.join(os.path.dirname(__file__), 'templates',
 WG_BOOTSTRAP_TEMPLATE = os.path.join(os.path.dirname(__file__), 'templates', 'wg-bootstrap.sh.j2')
 WG_MACOS_BOOTSTRAP_TEMPLATE = os.path.join(os.path.dirname(__file__), 'templates', 'wg-macos-bootstrap.sh.j2')
 
+# Environment for the autoinstall/bootstrap script templates above. Each is
+# compiled on first use and kept for the life of the process, as Flask does
+# for the page templates outside debug mode; requests only render.
+PROVISIONING_TEMPLATES = Environment(loader=FileSystemLoader(TEMPLATE_DIR), auto_reload=False)
+
+def provisioning_template(path):
+    """Compiled template for one of the *_TEMPLATE paths."""
+    return PROVISIONING_TEMPLATES.get_template(os.path.basename(path))
+
 app = Flask(__name__)
 
+# This node's hostname; fixed for the life of the service.
+LOCAL_HOSTNAME = platform.node()
+
+# etcd clients for this process, one per endpoint, handed out round-robin.
+# Built on first use so importing the app (tests, non-storage nodes) does
+# not touch etcd.
+_etcd_pool = None
+_etcd_pool_lock = threading.Lock()
+
+
+def etcd_pool():
+    global _etcd_pool
+    with _etcd_pool_lock:
+        if _etcd_pool is None:
+            _etcd_pool = EtcdPool()
+        return _etcd_pool
+
+
+def get_etcd_client():
+    """Return the next etcd client from the pool."""
+    return etcd_pool().get()
+
+
+# What a failed etcd round-trip raises: python-etcd3 maps the common gRPC
+# statuses to Etcd3Exception subclasses and lets the rest through as
+# RpcError; the pool raises ConnectionError when every endpoint is down.
+ETCD_ERRORS = (Etcd3Exception, grpc.RpcError, ConnectionError)
+
+
+def etcd_get_many(keys):
+    """Values of keys (None where unset) read in one pooled round-trip."""
+    client = get_etcd_client()
+    try:
+        return get_many(client, keys)
+    except ETCD_ERRORS:
+        etcd_pool().discard(client)
+        raise
+
+
+def etcd_get(key):
+    """Value of key (or None) read with a pooled client.
+
+    A client whose read fails is discarded from the pool, so its endpoint
+    reconnects instead of the next caller reusing a broken channel.
+    """
+    client = get_etcd_client()
+    try:
+        return client.get(key)[0]
+    except ETCD_ERRORS:
+        etcd_pool().discard(client)
+        raise
+
+# Shared keep-alive session for every HTTP probe this service makes: the
+# local service checks and the cluster-status fan-out to each node's
+# /api/health. Connections are pooled per host (enough pools to cover the
+# whole fleet), so repeat scrapes reuse sockets instead of reconnecting.
+# Each host's pool keeps as many idle connections as the fan-out can have
+# open to it at once (one per HOST_HEALTH_POOL worker); a smaller pool
+# would close the overflow after every burst of concurrent status polls.
+# The probes only go to localhost and cluster addresses, so proxy settings
+# from the environment are ignored; the squid check passes its proxy
+# explicitly. Timeouts are (connect, read): a local service that is up
+# accepts within milliseconds, so a dead one is reported after a quarter
+# second instead of holding up the health response.
+HTTP_SESSION = requests.Session()
+HTTP_SESSION.trust_env = False
+HTTP_SESSION.mount('http://', HTTPAdapter(pool_connections=64, pool_maxsize=32, max_retries=0))
+PROBE_TIMEOUT = (0.25, 2)
+
 # Node type interface configurations (can be overridden via env vars)
 # Env var format: NODE_INTERFACES_<TYPE>=cluster:uplink:amt (e.g. NODE_INTERFACES_COMPUTE=en*::)
 NODE_TYPE_INTERFACES = {
@@ -111,9 +212,6 @@ ETCD_PREFIX = '/cluster/nodes'
 # change. The inventory plugin treats any s\d+ hostname as a core node;
 # we mirror that by filtering on type == 'storage'.
 
-# Thread lock for allocation operations
-allocation_lock = threading.Lock()
-
 # Hostname route params flow into etcd keys (f"{ETCD_PREFIX}/by-hostname/...");
 # validate before interpolation so a crafted URL can't address adjacent etcd
 # namespaces. Covers <prefix><number> names and the dynamic dhcp-NNN form.
@@ -149,6 +247,13 @@ def determine_ip_from_hostname(hostname, via_wg=False):
     preserving the per-type hostname numbering. A physical compute c3
     lands at 10.0.0.53; a wg-bootstrapped compute c3 lands at 10.0.1.53.
     """
+    ips = _IP_TABLE.get(hostname)
+    if ips is not None:
+        return ips[1] if via_wg else ips[0]
+    return _compute_ip_from_hostname(hostname, via_wg)
+
+def _compute_ip_from_hostname(hostname, via_wg):
+    """Parse hostname and derive its IP (see determine_ip_from_hostname)."""
     if not hostname:
         return None
 
@@ -161,13 +266,11 @@ def determine_ip_from_hostname(hostname, via_wg=False):
     prefix = None
     num = None
     for p in IP_RANGES:
-        if hostname.startswith(p):
-            try:
-                num = int(hostname[len(p):])
-                prefix = p
-                break
-            except ValueError:
-                continue
+        tail = hostname[len(p):]
+        if hostname.startswith(p) and tail.isascii() and tail.isdigit():
+            num = int(tail)
+            prefix = p
+            break
 
     if prefix is None:
         return None
@@ -192,6 +295,23 @@ def determine_ip_from_hostname(hostname, via_wg=False):
         # Regular interface
         return f"10.0.0.{base_ip}"
 
+# Every canonical in-range name (s1..s20, s1a..s20a, ...) -> (LAN IP, WG IP),
+# precomputed so the per-record lookups in the listing endpoints are a dict
+# get. Anything else (zero-padded, out-of-range or unknown names) goes
+# through the parser, which raises or returns None as before.
+_IP_TABLE = {
+    name: (_compute_ip_from_hostname(name, False), _compute_ip_from_hostname(name, True))
+    for prefix, config in IP_RANGES.items()
+    for num in range(1, config['max'] + 1)
+    for name in (f"{prefix}{num}", f"{prefix}{num}a")
+}
+
+_MAC_SEPARATORS = str.maketrans('', '', ':-')
+
+def normalize_mac(mac_address):
+    """Lowercase a MAC address and strip ':'/'-' separators."""
+    return mac_address.translate(_MAC_SEPARATORS).lower()
+
 def determine_type_from_mac(mac_address):
     """Determine machine type based on MAC address prefix.
 
@@ -201,53 +321,217 @@ def determine_type_from_mac(mac_address):
     if not mac_address:
         return 'compute'
 
-    # Normalize MAC address to lowercase and remove separators
-    normalized_mac = mac_address.lower().replace(':', '').replace('-', '')
-
     # Check for storage prefix (58:47:ca becomes 5847ca)
-    if normalized_mac.startswith('5847ca'):
+    if normalize_mac(mac_address)[:6] == '5847ca':
         return 'storage'
 
     # Default to compute
     return 'compute'
 
-def get_next_hostname(client, node_type):
-    """Get the next available hostname for a node type"""
-    prefixes = {
-        'storage': 's',
-        'compute': 'c',
-        'macos': 'm',
-        'nvidia': 'nv',
-        'nas': 'nas',
-        'dev': 'd',
+# Hostname prefix allocated for each node type (<prefix><n>, n from 1).
+NODE_TYPE_PREFIXES = {
+    'storage': 's',
+    'compute': 'c',
+    'macos': 'm',
+    'nvidia': 'nv',
+    'nas': 'nas',
+    'dev': 'd',
+}
+
+def _next_free_bit(mask):
+    """Index of the lowest clear bit in mask."""
+    return (mask ^ (mask + 1)).bit_length() - 1
+
+def _allocated_mask(client, prefix):
+    """Bitmap of taken <prefix><n> hostnames: bit n-1 is set if n is allocated.
+
+    Built from a keys-only scan, so no allocation JSON is transferred or
+    decoded. Names sharing the prefix but not numbered under it (dhcp-NNN
+    under 'd') are ignored.
+    """
+    mask = 0
+    for _, metadata in client.get_prefix(f"{ETCD_PREFIX}/by-hostname/{prefix}", keys_only=True):
+        tail = metadata.key.decode().split('/')[-1][len(prefix):]
+        if tail.isdigit() and int(tail) >= 1:
+            mask |= 1 << (int(tail) - 1)
+    return mask
+
+def _pick_hostname(client, node_type, masks=None):
+    """Lowest free hostname for node_type. Raises ValueError when the
+    type's IP range is exhausted.
+
+    masks, if given, is a per-prefix dict of allocation bitmasks shared
+    across calls: it is filled from etcd on first use and the returned slot
+    is marked taken, so successive picks hand out distinct names.
+    """
+    prefix = NODE_TYPE_PREFIXES.get(node_type, 'c')
+    mask = masks.get(prefix) if masks is not None else None
+    if mask is None:
+        mask = _allocated_mask(client, prefix)
+    bit = _next_free_bit(mask)
+    if bit >= IP_RANGES[prefix]['max']:
+        raise ValueError(f"No free hostname for prefix '{prefix}' "
+                         f"(range 1-{IP_RANGES[prefix]['max']} exhausted)")
+    if masks is not None:
+        masks[prefix] = mask | (1 << bit)
+    return f"{prefix}{bit + 1}"
+
+def _new_allocation(hostname, machine_type, normalized_mac, via_wg):
+    """Allocation record for a freshly assigned hostname."""
+    return {
+        'hostname': hostname,
+        'type': machine_type,
+        'ip': determine_ip_from_hostname(hostname, via_wg=via_wg),
+        'amt_ip': determine_ip_from_hostname(hostname + "a"),
+        'mac': normalized_mac,
+        'via_wg': via_wg,
+        'allocated_at': datetime.now(UTC).isoformat()
     }
-    
-    prefix = prefixes.get(node_type, 'c')
-    
-    # Get all existing hostnames of this type
-    existing_numbers = []
-    for value, metadata in client.get_prefix(f"{ETCD_PREFIX}/by-hostname/{prefix}"):
-        if value:
-            hostname = metadata.key.decode().split('/')[-1]
+
+def _allocation_compares(client, normalized_mac, hostname):
+    return [
+        client.transactions.version(f"{ETCD_PREFIX}/by-mac/{normalized_mac}") == 0,
+        client.transactions.version(f"{ETCD_PREFIX}/by-hostname/{hostname}") == 0
+    ]
+
+def _allocation_puts(client, allocation_data):
+    allocation_json = orjson.dumps(allocation_data)
+    return [
+        client.transactions.put(f"{ETCD_PREFIX}/by-mac/{allocation_data['mac']}", allocation_json),
+        client.transactions.put(f"{ETCD_PREFIX}/by-hostname/{allocation_data['hostname']}", allocation_json)
+    ]
+
+def _commit_allocation(client, normalized_mac, machine_type, via_wg):
+    """Allocate a hostname for one MAC with compare-and-swap, retrying on
+    conflict. Returns the new record, or the MAC's existing one if another
+    writer allocated it first."""
+    # The DHCP server and other admin-api instances allocate concurrently,
+    # so there is no lock to take: commit via compare-and-swap on both keys
+    # and retry on conflict.
+    for _ in range(8):
+        allocation_data = _new_allocation(_pick_hostname(client, machine_type),
+                                          machine_type, normalized_mac, via_wg)
+        committed, _ = client.transaction(
+            compare=_allocation_compares(client, normalized_mac, allocation_data['hostname']),
+            success=_allocation_puts(client, allocation_data),
+            failure=[]
+        )
+        if committed:
+            return allocation_data
+
+        # Lost the race. If this MAC got allocated elsewhere, return that
+        # allocation; otherwise the hostname was taken — pick the next.
+        existing_data = client.get(f"{ETCD_PREFIX}/by-mac/{normalized_mac}")
+        if existing_data[0]:
+            return orjson.loads(existing_data[0])
+
+    raise RuntimeError(
+        f"allocation for {normalized_mac} failed: etcd transaction "
+        f"conflicted on every attempt")
+
+class _AllocationBatcher:
+    """Coalesces concurrent new-allocation requests into one etcd transaction.
+
+    A rack power-on sends a burst of /api/allocate calls at once. Callers
+    queue their request and wait; a single worker thread collects up to
+    MAX_BATCH requests (for at most WINDOW seconds after the first) and
+    commits them all in one transaction, so the burst costs a handful of
+    Raft commits instead of one per node. If the batch transaction loses a
+    race, or can't be planned, each request falls back to its own
+    compare-and-swap loop.
+    """
+    MAX_BATCH = 32
+    WINDOW = 0.005
+    WAIT_TIMEOUT = 30
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def submit(self, normalized_mac, machine_type, via_wg):
+        """Allocate for one MAC through the batch worker; blocks until done."""
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name='allocation-batcher',
+                                                daemon=True)
+                self._worker.start()
+        req = {'mac': normalized_mac, 'type': machine_type, 'via_wg': via_wg,
+               'done': threading.Event(), 'result': None, 'error': None}
+        self._queue.put(req)
+        if not req['done'].wait(self.WAIT_TIMEOUT):
+            raise RuntimeError(f"allocation for {normalized_mac} timed out waiting "
+                               f"for the allocation worker")
+        if req['error'] is not None:
+            raise req['error']
+        return req['result']
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.WINDOW
+            while len(batch) < self.MAX_BATCH:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
             try:
-                num = int(hostname[len(prefix):])
-                existing_numbers.append(num)
-            except:
-                pass
-    
-    # Find the next available number
-    next_num = 1
-    if existing_numbers:
-        existing_numbers.sort()
-        # Find first gap or use max+1
-        for i, num in enumerate(existing_numbers):
-            if num != i + 1:
-                next_num = i + 1
-                break
-        else:
-            next_num = len(existing_numbers) + 1
-    
-    return f"{prefix}{next_num}"
+                self._commit(batch)
+            except Exception as e:
+                for req in batch:
+                    if not req['done'].is_set():
+                        req['error'] = e
+                        req['done'].set()
+
+    @staticmethod
+    def _finish(reqs, result=None, error=None):
+        for req in reqs:
+            req['result'] = result
+            req['error'] = error
+            req['done'].set()
+
+    def _commit(self, batch):
+        client = get_etcd_client()
+        # The same MAC queued twice (a retrying PXE client) is allocated
+        # once and both callers get the same record.
+        by_mac = {}
+        for req in batch:
+            by_mac.setdefault(req['mac'], []).append(req)
+
+        if len(by_mac) > 1:
+            try:
+                masks = {}
+                planned = [(reqs, _new_allocation(_pick_hostname(client, reqs[0]['type'], masks),
+                                                  reqs[0]['type'], mac, reqs[0]['via_wg']))
+                           for mac, reqs in by_mac.items()]
+            except ValueError as e:
+                # A range is exhausted; let each request find out on its own.
+                print(f"allocation batch of {len(by_mac)} not planned: {e}", file=sys.stderr)
+                planned = None
+            if planned is not None:
+                compare, success = [], []
+                for _, allocation_data in planned:
+                    compare += _allocation_compares(client, allocation_data['mac'],
+                                                    allocation_data['hostname'])
+                    success += _allocation_puts(client, allocation_data)
+                committed, _ = client.transaction(compare=compare, success=success, failure=[])
+                if committed:
+                    for reqs, allocation_data in planned:
+                        self._finish(reqs, result=allocation_data)
+                    return
+
+        for mac, reqs in by_mac.items():
+            try:
+                result = _commit_allocation(client, mac, reqs[0]['type'], reqs[0]['via_wg'])
+            except Exception as e:
+                self._finish(reqs, error=e)
+            else:
+                self._finish(reqs, result=result)
+
+_allocation_batcher = _AllocationBatcher()
 
 def get_or_create_allocation(mac_address, node_type=None, via_wg=False):
     """Get existing allocation or create new one for non-normalized MAC address.
@@ -261,13 +545,22 @@ def get_or_create_allocation(mac_address, node_type=None, via_wg=False):
                    from 10.0.1.0/24 instead of 10.0.0.0/24. Preserved in
                    the allocation record so list/lookup stays consistent.
     """
+    normalized_mac = normalize_mac(mac_address)
+
+    # Hot path: a node asking again for an allocation that needs no rewrite
+    # is answered from the watch cache without an etcd round-trip.
+    cached = cached_allocation(normalized_mac)
+    if (cached is not None and 'amt_ip' in cached
+            and bool(cached.get('via_wg', False)) == via_wg
+            and (not node_type or cached.get('type') == node_type)):
+        return cached
+
     client = get_etcd_client()
-    normalized_mac = mac_address.lower().replace(':', '').replace('-', '')
 
     # Check if allocation already exists
     existing_data = client.get(f"{ETCD_PREFIX}/by-mac/{normalized_mac}")
     if existing_data[0]:
-        data = json.loads(existing_data[0].decode())
+        data = orjson.loads(existing_data[0])
         existing_via_wg = bool(data.get('via_wg', False))
         # Some old entries may lack IP or amt_ip, fill them in
         if 'amt_ip' not in data:
@@ -287,7 +580,7 @@ def get_or_create_allocation(mac_address, node_type=None, via_wg=False):
             data['via_wg'] = via_wg
             data['updated_at'] = datetime.now(UTC).isoformat()
             existing_via_wg = via_wg
-            allocation_json = json.dumps(data)
+            allocation_json = orjson.dumps(data)
             client.put(f"{ETCD_PREFIX}/by-mac/{normalized_mac}", allocation_json)
             client.put(f"{ETCD_PREFIX}/by-hostname/{data['hostname']}", allocation_json)
 
@@ -295,7 +588,7 @@ def get_or_create_allocation(mac_address, node_type=None, via_wg=False):
         if node_type and data.get('type') != node_type:
             old_hostname = data['hostname']
             # Allocate new hostname for the new type
-            new_hostname = get_next_hostname(client, node_type)
+            new_hostname = _pick_hostname(client, node_type)
             new_ip = determine_ip_from_hostname(new_hostname, via_wg=existing_via_wg)
             new_amt_ip = determine_ip_from_hostname(new_hostname + "a")
 
@@ -307,7 +600,7 @@ def get_or_create_allocation(mac_address, node_type=None, via_wg=False):
             data['updated_at'] = datetime.now(UTC).isoformat()
 
             # Update in etcd (delete old hostname entry, create new one)
-            allocation_json = json.dumps(data)
+            allocation_json = orjson.dumps(data)
             client.delete(f"{ETCD_PREFIX}/by-hostname/{old_hostname}")
             client.put(f"{ETCD_PREFIX}/by-mac/{normalized_mac}", allocation_json)
             client.put(f"{ETCD_PREFIX}/by-hostname/{new_hostname}", allocation_json)
@@ -316,57 +609,8 @@ def get_or_create_allocation(mac_address, node_type=None, via_wg=False):
 
 
     # Create new allocation
-    with allocation_lock:
-        # Double-check after acquiring lock
-        existing_data = client.get(f"{ETCD_PREFIX}/by-mac/{normalized_mac}")
-        if existing_data[0]:
-            return json.loads(existing_data[0].decode())
-
-        # Determine machine type and allocate hostname
-        machine_type = node_type or determine_type_from_mac(mac_address)
-
-        # allocation_lock only serializes this process; the DHCP server (and
-        # any other admin-api instance) allocates concurrently, so commit via
-        # compare-and-swap and retry on conflict.
-        for _ in range(5):
-            hostname = get_next_hostname(client, machine_type)
-            ip_address = determine_ip_from_hostname(hostname, via_wg=via_wg)
-            amt_ip_address = determine_ip_from_hostname(hostname + "a")
-
-            allocation_data = {
-                'hostname': hostname,
-                'type': machine_type,
-                'ip': ip_address,
-                'amt_ip': amt_ip_address,
-                'mac': normalized_mac,
-                'via_wg': via_wg,
-                'allocated_at': datetime.now(UTC).isoformat()
-            }
-
-            allocation_json = json.dumps(allocation_data)
-            committed, _ = client.transaction(
-                compare=[
-                    client.transactions.version(f"{ETCD_PREFIX}/by-mac/{normalized_mac}") == 0,
-                    client.transactions.version(f"{ETCD_PREFIX}/by-hostname/{hostname}") == 0
-                ],
-                success=[
-                    client.transactions.put(f"{ETCD_PREFIX}/by-mac/{normalized_mac}", allocation_json),
-                    client.transactions.put(f"{ETCD_PREFIX}/by-hostname/{hostname}", allocation_json)
-                ],
-                failure=[]
-            )
-            if committed:
-                return allocation_data
-
-            # Lost the race. If this MAC got allocated elsewhere, return that
-            # allocation; otherwise the hostname was taken — pick the next.
-            existing_data = client.get(f"{ETCD_PREFIX}/by-mac/{normalized_mac}")
-            if existing_data[0]:
-                return json.loads(existing_data[0].decode())
-
-        raise RuntimeError(
-            f"allocation for {normalized_mac} failed: etcd transaction "
-            f"conflicted on every attempt")
+    machine_type = node_type or determine_type_from_mac(mac_address)
+    return _allocation_batcher.submit(normalized_mac, machine_type, via_wg)
 
 @app.route('/api/allocate')
 def allocate_hostname():
@@ -481,58 +725,281 @@ def wg_poll(hostname):
     return jsonify(resp)
 
 
-@app.route('/api/status')
-def status():
-    """Get current allocation counts by type"""
+# In-process mirror of {ETCD_PREFIX}/by-hostname/, kept current by a watch
+# so the listing endpoints serve from memory instead of a range read plus a
+# JSON decode per allocation on every request. The watcher is started from
+# __main__ on etcd nodes only; until it has loaded (and whenever the watch
+# drops) readers fall back to scanning etcd directly.
+_cache_lock = threading.RLock()
+_allocation_cache = {}  # hostname -> allocation dict
+_allocation_cache_ready = False
+_allocation_cache_generation = 0  # bumped on every cache change
+_allocation_views = {}  # view name -> (generation, value)
+
+
+def _decode_allocation(value):
+    """Parse an allocation record, or None if it isn't a JSON object.
+
+    Adds 'mac_colon' (the normalized MAC in aa:bb:cc:dd:ee:ff form) once
+    here so per-request renderers don't reformat it.
+    """
     try:
-        client = get_etcd_client()
-    except Exception as e:
-        return jsonify({'error': f'etcd connection failed: {str(e)}'}), 503
-    
+        allocation = orjson.loads(value)
+    except ValueError:
+        return None
+    if not isinstance(allocation, dict):
+        return None
+    mac = allocation.get('mac')
+    if isinstance(mac, str):
+        allocation['mac_colon'] = ':'.join(mac[i:i+2] for i in range(0, 12, 2))
+    return allocation
+
+
+def get_allocation_records():
+    """Return all by-hostname allocation records (list of dicts).
+
+    Served from the watch cache when it is live, otherwise read from etcd.
+    Raises if etcd is needed and unreachable.
+    """
+    with _cache_lock:
+        if _allocation_cache_ready:
+            return list(_allocation_cache.values())
+
+    records = []
+    for value, metadata in get_etcd_client().get_prefix(f"{ETCD_PREFIX}/by-hostname/"):
+        if value:
+            allocation = _decode_allocation(value)
+            if allocation is not None:
+                records.append(allocation)
+    return records
+
+
+def allocation_view(name, build):
+    """Return build(records), memoized per allocation cache generation.
+
+    Lets endpoints keep a fully rendered listing around until an
+    allocation actually changes. When the cache isn't live there's nothing
+    to key on, so build() runs on a fresh etcd read every time.
+    """
+    with _cache_lock:
+        if not _allocation_cache_ready:
+            generation = None
+        else:
+            generation = _allocation_cache_generation
+            memo = _allocation_views.get(name)
+            if memo is not None and memo[0] == generation:
+                return memo[1]
+            records = list(_allocation_cache.values())
+    if generation is None:
+        return build(get_allocation_records())
+
+    value = build(records)
+    with _cache_lock:
+        _allocation_views[name] = (generation, value)
+    return value
+
+
+def _allocations_by_mac(records):
+    return {r['mac']: r for r in records if r.get('mac')}
+
+
+def cached_allocation(normalized_mac):
+    """Copy of the cached allocation for a normalized MAC, or None.
+
+    Also None while the watch cache isn't live; callers then read etcd.
+    """
+    with _cache_lock:
+        if not _allocation_cache_ready:
+            return None
+    allocation = allocation_view('by-mac', _allocations_by_mac).get(normalized_mac)
+    return dict(allocation) if allocation is not None else None
+
+
+def _watch_allocations():
+    """Load by-hostname allocations and apply watch events to the cache.
+
+    Runs forever. The watch starts at the revision right after the initial
+    load so no update is missed in between. On any failure the cache is
+    marked stale, the client is discarded from the pool so its endpoint
+    reconnects, and the load+watch is restarted.
+    """
+    global _allocation_cache_ready, _allocation_cache_generation
+    prefix = f"{ETCD_PREFIX}/by-hostname/"
+    while True:
+        client = None
+        cancel = None
+        try:
+            client = get_etcd_client()
+            resp = client.get_prefix_response(prefix)
+            snapshot = {}
+            for kv in resp.kvs:
+                allocation = _decode_allocation(kv.value) if kv.value else None
+                if allocation is not None:
+                    snapshot[kv.key.decode()[len(prefix):]] = allocation
+            events, cancel = client.watch_prefix(
+                prefix, start_revision=resp.header.revision + 1)
+            with _cache_lock:
+                _allocation_cache.clear()
+                _allocation_cache.update(snapshot)
+                _allocation_cache_generation += 1
+                _allocation_cache_ready = True
+            print(f"allocation cache: loaded {len(snapshot)} allocations at "
+                  f"revision {resp.header.revision}", file=sys.stderr)
+
+            for event in events:
+                name = event.key.decode()[len(prefix):]
+                allocation = (None if isinstance(event, DeleteEvent)
+                              else _decode_allocation(event.value))
+                with _cache_lock:
+                    if allocation is None:
+                        _allocation_cache.pop(name, None)
+                    else:
+                        _allocation_cache[name] = allocation
+                    _allocation_cache_generation += 1
+            print("allocation cache: watch ended, restarting", file=sys.stderr)
+        except Exception as e:
+            print(f"allocation cache: watch failed, serving from etcd reads: {e}",
+                  file=sys.stderr)
+
+        with _cache_lock:
+            _allocation_cache_ready = False
+        if cancel is not None:
+            try:
+                cancel()
+            except Exception as e:
+                print(f"allocation cache: watch cancel failed: {e}", file=sys.stderr)
+        if client is not None:
+            etcd_pool().discard(client)
+        time.sleep(5)
+
+
+def start_allocation_watcher():
+    """Start the allocation cache watcher in a daemon thread."""
+    threading.Thread(target=_watch_allocations, name='allocation-watch',
+                     daemon=True).start()
+
+
+# Watch-fed mirrors of the cluster-wide keys every health and status poll
+# reads: the service leaders and the TLS certificate. Each prefix has its
+# own watcher (same load+watch+restart cycle as the allocation cache); a
+# prefix is present in _mirrors only while its watch is live, and readers
+# fall back to etcd otherwise.
+MIRRORED_PREFIXES = ('/cluster/leader/', '/cluster/tls/cert')
+_mirror_lock = threading.Lock()
+_mirrors = {}  # prefix -> {key: (value, mod_revision)}
+
+
+def etcd_mirrored(key):
+    """(value, mod_revision) of key from a live mirror, or None if no live
+    mirror covers it. value and mod_revision are None for an unset key."""
+    with _mirror_lock:
+        for prefix, values in _mirrors.items():
+            if key.startswith(prefix):
+                return values.get(key, (None, None))
+    return None
+
+
+def _watch_mirror(prefix):
+    """Load the keys under prefix into _mirrors and apply watch events.
+
+    Runs forever, restarting after any failure like _watch_allocations.
+    """
+    while True:
+        client = None
+        cancel = None
+        try:
+            client = get_etcd_client()
+            resp = client.get_prefix_response(prefix)
+            values = {kv.key.decode(): (kv.value, kv.mod_revision) for kv in resp.kvs}
+            events, cancel = client.watch_prefix(
+                prefix, start_revision=resp.header.revision + 1)
+            with _mirror_lock:
+                _mirrors[prefix] = values
+
+            for event in events:
+                key = event.key.decode()
+                with _mirror_lock:
+                    if isinstance(event, DeleteEvent):
+                        values.pop(key, None)
+                    else:
+                        values[key] = (event.value, event.mod_revision)
+            print(f"mirror {prefix}: watch ended, restarting", file=sys.stderr)
+        except Exception as e:
+            print(f"mirror {prefix}: watch failed, serving from etcd reads: {e}",
+                  file=sys.stderr)
+
+        with _mirror_lock:
+            _mirrors.pop(prefix, None)
+        if cancel is not None:
+            try:
+                cancel()
+            except Exception as e:
+                print(f"mirror {prefix}: watch cancel failed: {e}", file=sys.stderr)
+        if client is not None:
+            etcd_pool().discard(client)
+        time.sleep(5)
+
+
+def start_mirror_watchers():
+    """Start one daemon watcher thread per MIRRORED_PREFIXES entry."""
+    for prefix in MIRRORED_PREFIXES:
+        threading.Thread(target=_watch_mirror, args=(prefix,),
+                         name='mirror-watch', daemon=True).start()
+
+
+def _count_by_type(records):
+    """Allocation counts by node type, for /api/status."""
     counts = {'storage': 0, 'compute': 0, 'macos': 0}
     
     # Count allocations by type
-    for value, metadata in client.get_prefix(f"{ETCD_PREFIX}/by-hostname/"):
-        if value:
-            try:
-                allocation = json.loads(value.decode())
-                node_type = allocation.get('type', 'compute')
-                counts[node_type] = counts.get(node_type, 0) + 1
-            except:
-                pass
+    for allocation in records:
+        node_type = allocation.get('type', 'compute')
+        counts[node_type] = counts.get(node_type, 0) + 1
     
-    return jsonify(counts)
+    return counts
 
-@app.route('/api/allocations')
-def allocations():
-    """Get all current allocations"""
+@app.route('/api/status')
+def status():
+    """Get current allocation counts by type"""
     try:
-        client = get_etcd_client()
+        counts = allocation_view('status', _count_by_type)
     except Exception as e:
         return jsonify({'error': f'etcd connection failed: {str(e)}'}), 503
     
+    return jsonify(counts)
+
+def _render_allocations(records):
+    """Serialize the /api/allocations listing."""
     allocations = []
     
     # Get all allocations from by-hostname (to avoid duplicates)
-    for value, metadata in client.get_prefix(f"{ETCD_PREFIX}/by-hostname/"):
-        if value:
-            try:
-                allocation = json.loads(value.decode())
-                allocations.append({
-                    'mac': allocation['mac'],
-                    'hostname': allocation['hostname'],
-                    'type': allocation['type'],
-                    'ip': allocation['ip'],
-                    'allocated_at': allocation.get('allocated_at', 0),
-                    'disabled': allocation.get('disabled', False)
-                })
-            except:
-                pass
+    for allocation in records:
+        try:
+            allocations.append({
+                'mac': allocation['mac'],
+                'hostname': allocation['hostname'],
+                'type': allocation['type'],
+                'ip': allocation['ip'],
+                'allocated_at': allocation.get('allocated_at', 0),
+                'disabled': allocation.get('disabled', False)
+            })
+        except KeyError:
+            pass
     
     # Sort by hostname
     allocations.sort(key=lambda x: (x['type'], int(x['hostname'][1:]) if x['hostname'][1:].isdigit() else 0))
     
-    return jsonify(allocations)
+    return orjson.dumps(allocations)
+
+@app.route('/api/allocations')
+def allocations():
+    """Get all current allocations"""
+    try:
+        body = allocation_view('allocations', _render_allocations)
+    except Exception as e:
+        return jsonify({'error': f'etcd connection failed: {str(e)}'}), 503
+    
+    return Response(body, mimetype='application/json')
 
 
 # Cluster mutations (disable/enable, drain, asset edits) are CLI-only:
@@ -540,71 +1007,76 @@ def allocations():
 # etcd client certificate. The admin API serves reads and the TOFU
 # bootstrap surface (/api/allocate, /bootstrap/*, /autoinstall/*).
 
+def _dhcp_host_lines(records):
+    """Sorted dnsmasq dhcp-host lines for all allocations."""
+    dhcp_config = []
+    
+    # Get all allocations
+    for allocation in records:
+        try:
+            dhcp_config.append(
+                f"dhcp-host={allocation['mac_colon']},{allocation['hostname']},"
+                f"{allocation['ip']},infinite\n")
+        except KeyError:
+            pass
+    
+    dhcp_config.sort()
+    return dhcp_config
+
 @app.route('/api/dhcp-config')
 def get_dhcp_config():
     """Generate DHCP configuration from etcd allocations"""
     try:
-        client = get_etcd_client()
+        dhcp_config = allocation_view('dhcp-config', _dhcp_host_lines)
     except Exception as e:
         return f"# etcd connection failed: {str(e)}\n", 503
     
-    dhcp_config = []
-    
-    # Get all allocations
-    for value, metadata in client.get_prefix(f"{ETCD_PREFIX}/by-hostname/"):
-        if value:
-            try:
-                allocation = json.loads(value.decode())
-                mac = allocation['mac']
-                hostname = allocation['hostname']
-                ip = allocation['ip']
-                
-                # Convert normalized MAC back to colon format
-                mac_formatted = ':'.join(mac[i:i+2] for i in range(0, 12, 2))
-                dhcp_config.append(f"dhcp-host={mac_formatted},{hostname},{ip},infinite")
-            except:
-                pass
-    
     if dhcp_config:
-        return '\n'.join(sorted(dhcp_config)) + '\n', 200, {'Content-Type': 'text/plain'}
+        return Response(iter(dhcp_config), mimetype='text/plain')
     else:
         return "# No static hosts configured yet\n", 200, {'Content-Type': 'text/plain'}
 
+def _allocation_host_lines(records):
+    """Sorted hosts-file lines for all allocations and their AMT names."""
+    hosts_entries = []
+    
+    # Get all allocations
+    for allocation in records:
+        try:
+            hostname = allocation['hostname']
+            ip = allocation['ip']
+            
+            # Skip AMT hostnames registered as nodes - they get correct
+            # entries auto-generated from the base node below
+            if hostname.endswith('a') and determine_ip_from_hostname(hostname):
+                continue
+            
+            # Add main hostname entry
+            hosts_entries.append(f"{ip} {hostname} {hostname}.xc\n")
+            
+            # Add AMT hostname entry if this is a regular node (not already AMT)
+            if not hostname.endswith('a'):
+                amt_hostname = f"{hostname}a"
+                amt_ip = determine_ip_from_hostname(amt_hostname)
+                if amt_ip:
+                    hosts_entries.append(f"{amt_ip} {amt_hostname} {amt_hostname}.xc\n")
+        except (KeyError, ValueError):
+            pass
+    
+    hosts_entries.sort()
+    return hosts_entries
+
 @app.route('/api/hosts')
 def get_hosts():
     """Generate hosts file format from etcd allocations"""
     try:
         client = get_etcd_client()
+        allocation_lines = allocation_view('hosts', _allocation_host_lines)
     except Exception as e:
         return f"# etcd connection failed: {str(e)}\n", 503
     
     hosts_entries = []
     
-    # Get all allocations
-    for value, metadata in client.get_prefix(f"{ETCD_PREFIX}/by-hostname/"):
-        if value:
-            try:
-                allocation = json.loads(value.decode())
-                hostname = allocation['hostname']
-                ip = allocation['ip']
-                
-                # Skip AMT hostnames registered as nodes - they get correct
-                # entries auto-generated from the base node below
-                if hostname.endswith('a') and determine_ip_from_hostname(hostname):
-                    continue
-                
-                # Add main hostname entry
-                hosts_entries.append(f"{ip} {hostname} {hostname}.xc")
-                
-                # Add AMT hostname entry if this is a regular node (not already AMT)
-                if not hostname.endswith('a'):
-                    amt_hostname = f"{hostname}a"
-                    amt_ip = determine_ip_from_hostname(amt_hostname)
-                    if amt_ip:
-                        hosts_entries.append(f"{amt_ip} {amt_hostname} {amt_hostname}.xc")
-            except:
-                pass
-    
     # Frontend nodes live under a separate etcd prefix (not by-hostname) and
     # sit outside the cluster subnet — emit their reachable address so the
     # cluster can resolve/ping/ssh them by name. Only IP-registered nodes can
@@ -612,44 +1084,159 @@ def get_hosts():
     for value, metadata in client.get_prefix("/cluster/nodes/frontend/"):
         if value:
             try:
-                node = json.loads(value.decode())
-                name = node.get('name')
-                ip = node.get('ip')
-                if name and ip:
-                    hosts_entries.append(f"{ip} {name} {name}.xc")
-            except:
-                pass
+                node = orjson.loads(value)
+            except orjson.JSONDecodeError as e:
+                print(f"skipping frontend node {metadata.key.decode()}: {e}", file=sys.stderr)
+                continue
+            if not isinstance(node, dict):
+                continue
+            name = node.get('name')
+            ip = node.get('ip')
+            if name and ip:
+                hosts_entries.append(f"{ip} {name} {name}.xc\n")
 
     # Add service aliases that point to storage VIP
-    hosts_entries.append("10.0.0.100 registry.xc")
-    hosts_entries.append("10.0.0.100 admin.xc")
-    hosts_entries.append("10.0.0.100 inference.xc")
-    hosts_entries.append("10.0.0.100 auth.xc")
-
-    if hosts_entries:
-        return '\n'.join(sorted(hosts_entries)) + '\n', 200, {'Content-Type': 'text/plain'}
-    else:
-        return "# No static hosts configured yet\n", 200, {'Content-Type': 'text/plain'}
-
-def check_service_status(service_name):
-    """Check if a systemd service is active"""
+    hosts_entries.append("10.0.0.100 registry.xc\n")
+    hosts_entries.append("10.0.0.100 admin.xc\n")
+    hosts_entries.append("10.0.0.100 inference.xc\n")
+    hosts_entries.append("10.0.0.100 auth.xc\n")
+
+    # Both inputs are sorted, so merging them streams the lines out in
+    # order without building and joining one combined list.
+    hosts_entries.sort()
+    return Response(heapq.merge(allocation_lines, hosts_entries), mimetype='text/plain')
+
+# Per-thread system bus connection and the pystemd units loaded on it.
+# sd-bus connections must not be shared between threads, but every unit a
+# thread queries can share that thread's one connection.
+_systemd_units = threading.local()
+
+# service name -> (active, checked_at). Same idea as _port_cache below:
+# overlapping health polls ask about the same units within a second or two.
+_service_cache = {}
+SERVICE_CACHE_TTL = 2
+
+def check_service_status(service_name, fresh=False):
+    """Check if a systemd service is active.
+
+    Answers from a SERVICE_CACHE_TTL-second cache unless fresh is set.
+    """
+    now = time.monotonic()
+    cached = _service_cache.get(service_name)
+    if not fresh and cached is not None and now - cached[1] < SERVICE_CACHE_TTL:
+        return cached[0]
+    active = _query_service_status(service_name)
+    _service_cache[service_name] = (active, now)
+    return active
+
+def _systemctl_is_active(service_name):
+    """Ask systemctl whether a service is active (a fork per call)."""
     try:
         result = subprocess.run(['systemctl', 'is-active', service_name], 
                               capture_output=True, text=True, timeout=5)
         return result.stdout.strip() == 'active'
-    except:
+    except (OSError, subprocess.TimeoutExpired) as e:
+        print(f"systemctl is-active {service_name} failed: {e}", file=sys.stderr)
         return False
 
-def check_port_open(host, port, timeout=3):
-    """Check if a port is open on a host"""
+def _query_service_status(service_name):
+    """Ask systemd whether a service is active.
+
+    Goes over D-Bus (reusing this thread's bus connection across calls)
+    rather than forking systemctl for every probe; systemctl is only the
+    fallback when pystemd is missing or the bus query fails.
+    """
+    if SystemdUnit is None:
+        return _systemctl_is_active(service_name)
+
+    unit_name = service_name if '.' in service_name else f'{service_name}.service'
     try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(timeout)
-        result = sock.connect_ex((host, port))
-        sock.close()
-        return result == 0
-    except:
-        return False
+        bus = getattr(_systemd_units, 'bus', None)
+        if bus is None:
+            bus = SystemdBus()
+            bus.open()
+            _systemd_units.bus = bus
+            _systemd_units.units = {}
+        units = _systemd_units.units
+        unit = units.get(unit_name)
+        if unit is None:
+            unit = SystemdUnit(unit_name.encode(), bus=bus)
+            unit.load()
+            units[unit_name] = unit
+        return unit.Unit.ActiveState == b'active'
+    except Exception as e:
+        # Start over with a new connection; this one may be what broke.
+        _systemd_units.bus = None
+        print(f"systemd state query for {unit_name} failed, asking systemctl: {e}",
+              file=sys.stderr)
+        return _systemctl_is_active(service_name)
+
+# (host, port) -> (open, checked_at). A health poll probes the same local
+# ports several times over, and concurrent polls overlap; a short TTL
+# collapses those into one connect.
+_port_cache = {}
+PORT_CACHE_TTL = 2
+
+def check_port_open(host, port, timeout=3, fresh=False):
+    """Check if a port is open on a host (cached unless fresh is set)"""
+    return check_ports_open(host, [port], timeout, fresh)[port]
+
+def check_ports_open(host, ports, timeout=3, fresh=False):
+    """{port: open} for several ports on one host.
+
+    Uncached ports are connected to all at once with non-blocking sockets
+    and awaited together, so the sweep takes one timeout at most rather
+    than one per port.
+    """
+    now = time.monotonic()
+    results = {}
+    checked = []
+    selector = selectors.DefaultSelector()
+    try:
+        for port in ports:
+            cached = _port_cache.get((host, port))
+            if not fresh and cached is not None and now - cached[1] < PORT_CACHE_TTL:
+                results[port] = cached[0]
+                continue
+            checked.append(port)
+            try:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM | socket.SOCK_NONBLOCK)
+            except OSError:
+                results[port] = False
+                continue
+            try:
+                result = sock.connect_ex((host, port))
+            except OSError:
+                result = errno.EHOSTUNREACH
+            if result == errno.EINPROGRESS:
+                selector.register(sock, selectors.EVENT_WRITE, port)
+            else:
+                sock.close()
+                results[port] = result == 0
+
+        deadline = now + timeout
+        while selector.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            for key, _ in selector.select(remaining):
+                sock = key.fileobj
+                results[key.data] = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0
+                selector.unregister(sock)
+                sock.close()
+    finally:
+        # Whatever is still connecting has timed out
+        for key in list(selector.get_map().values()):
+            results.setdefault(key.data, False)
+            key.fileobj.close()
+        selector.close()
+
+    # Stamped now that the results are in, so a probe that waited out the
+    # timeout is cached for the full TTL too
+    done = time.monotonic()
+    for port in checked:
+        _port_cache[(host, port)] = (results[port], done)
+    return results
 
 def check_ceph_status():
     """Check Ceph cluster health"""
@@ -674,8 +1261,15 @@ def check_ceph_status():
             }
         else:
             return {'status': 'error', 'details': result.stderr.strip()}
-    except:
-        return {'status': 'unavailable', 'details': 'ceph command failed'}
+    except (OSError, subprocess.TimeoutExpired) as e:
+        return {'status': 'unavailable', 'details': f'ceph command failed: {e}'}
+
+# Resolver pointed straight at the local dnsmasq, built once. configure=False
+# skips reading /etc/resolv.conf, whose nameservers we'd override anyway.
+LOCAL_RESOLVER = dns.resolver.Resolver(configure=False)
+LOCAL_RESOLVER.nameservers = ['127.0.0.1']
+LOCAL_RESOLVER.timeout = 3
+LOCAL_RESOLVER.lifetime = 5
 
 def check_dns_status():
     """Check DNS (dnsmasq) service and functionality"""
@@ -688,21 +1282,14 @@ def check_dns_status():
         dns_details = "DNS query failed"
         
         try:
-            # Create a resolver that queries the local DNS server directly
-            resolver = dns.resolver.Resolver()
-            resolver.nameservers = ['127.0.0.1']
-            resolver.timeout = 3
-            resolver.lifetime = 5
-            
             # Query local hostname A record
-            local_hostname = platform.node()
-            answer = resolver.resolve(local_hostname, 'A')
+            answer = LOCAL_RESOLVER.resolve(LOCAL_HOSTNAME, 'A')
             if answer:
                 resolved_ips = [str(rdata) for rdata in answer]
                 dns_working = True
-                dns_details = f"Local DNS server responding ({local_hostname} -> {', '.join(resolved_ips)})"
+                dns_details = f"Local DNS server responding ({LOCAL_HOSTNAME} -> {', '.join(resolved_ips)})"
             else:
-                dns_details = f"Local DNS query for {local_hostname} returned no results"
+                dns_details = f"Local DNS query for {LOCAL_HOSTNAME} returned no results"
                 
         except dns.resolver.Timeout:
             dns_details = "Local DNS query timeout"
@@ -735,8 +1322,38 @@ def check_dns_status():
     except Exception as e:
         return {'status': 'error', 'details': f'DNS check failed: {str(e)}'}
 
+# Cluster-wide lookups that every status poll repeats (leadership, the TLS
+# certificate) change rarely; concurrent status pages, /metrics and the
+# health endpoint share one etcd read per LOOKUP_CACHE_TTL seconds.
+LOOKUP_CACHE_TTL = 5
+
+
+def _ttl_cached(func):
+    """Memoize a no-argument lookup for LOOKUP_CACHE_TTL seconds."""
+    last = None  # (value, fetched_at)
+
+    @functools.wraps(func)
+    def wrapper():
+        nonlocal last
+        now = time.monotonic()
+        cached = last
+        if cached is not None and now - cached[1] < LOOKUP_CACHE_TTL:
+            return cached[0]
+        value = func()
+        last = (value, now)
+        return value
+    return wrapper
+
+
+# Fields of the last parsed cluster certificate, keyed by the etcd
+# mod_revision of /cluster/tls/cert, so repeated polls skip the PEM/ASN.1
+# parse until the certificate is actually replaced.
+_cert_cache = {'mod_revision': None}
+
+@_ttl_cached
 def check_certificate_expiry():
     """Check TLS certificate expiry from etcd"""
+    global _cert_cache
     # The cluster TLS cert lives in etcd and is core-only. Non-storage nodes
     # hold no etcd client (etcd is firewalled to s*), and this is a cluster-wide
     # metric the core nodes already report, so skip it off-core.
@@ -750,8 +1367,13 @@ def check_certificate_expiry():
             }
         }
     try:
-        client = get_etcd_client()
-        cert_value, _ = client.get('/cluster/tls/cert')
+        mirrored = etcd_mirrored('/cluster/tls/cert')
+        if mirrored is not None:
+            cert_value, cert_revision = mirrored
+        else:
+            client = get_etcd_client()
+            cert_value, cert_meta = client.get('/cluster/tls/cert')
+            cert_revision = cert_meta.mod_revision if cert_meta else None
         
         if not cert_value:
             return {
@@ -763,12 +1385,20 @@ def check_certificate_expiry():
                 }
             }
         
-        # Parse the certificate
-        cert_pem = cert_value.decode()
-        cert = x509.load_pem_x509_certificate(cert_pem.encode(), default_backend())
+        # Parse the certificate, unless it's the one we parsed last time
+        cached = _cert_cache
+        if cached['mod_revision'] != cert_revision:
+            cert = x509.load_pem_x509_certificate(cert_value, default_backend())
+            cached = {
+                'mod_revision': cert_revision,
+                'expires_at': cert.not_valid_after,
+                'subject': cert.subject.rfc4514_string(),
+                'issuer': cert.issuer.rfc4514_string(),
+            }
+            _cert_cache = cached
         
         # Get expiry date
-        expires_at = cert.not_valid_after
+        expires_at = cached['expires_at']
         now = datetime.now(UTC).replace(tzinfo=None)  # Remove timezone for comparison
         
         # Calculate days until expiry
@@ -795,8 +1425,8 @@ def check_certificate_expiry():
                 'message': message,
                 'days_until_expiry': days_until_expiry,
                 'expires_at': expires_at.isoformat(),
-                'subject': cert.subject.rfc4514_string(),
-                'issuer': cert.issuer.rfc4514_string()
+                'subject': cached['subject'],
+                'issuer': cached['issuer']
             }
         }
         
@@ -910,7 +1540,7 @@ def check_docker_registry():
             test_urls = ['http://localhost:5000/v2/', 'http://10.0.0.100:5000/v2/']
             for url in test_urls:
                 try:
-                    health_response = requests.get(url, timeout=5)
+                    health_response = HTTP_SESSION.get(url, timeout=PROBE_TIMEOUT)
                     if health_response.status_code == 200:
                         registry_healthy = True
                         registry_version = health_response.headers.get('Docker-Distribution-Api-Version', 'unknown')
@@ -990,7 +1620,7 @@ def check_tang_service():
         
         if tang_port_open:
             try:
-                adv_response = requests.get('http://localhost:8777/adv', timeout=5)
+                adv_response = HTTP_SESSION.get('http://localhost:8777/adv', timeout=PROBE_TIMEOUT)
                 if adv_response.status_code == 200:
                     tang_healthy = True
                     # Try to parse the advertisement to count keys
@@ -1000,7 +1630,7 @@ def check_tang_service():
                             tang_keys = len(adv_data['keys'])
                         else:
                             tang_keys = 'unknown'
-                    except:
+                    except ValueError:
                         tang_keys = 'unknown'
                 else:
                     tang_error = f'Tang advertisement returned HTTP {adv_response.status_code}'
@@ -1043,24 +1673,31 @@ def check_tang_service():
             'details': {'message': f'Tang check failed: {str(e)}'}
         }
 
+def _mountinfo_entry(path):
+    """Return (source, fstype, options) for the mount at path, or None.
+
+    Reads /proc/self/mountinfo directly instead of running mountpoint and
+    findmnt. The last entry wins, as it is the one visible on top.
+    """
+    entry = None
+    with open('/proc/self/mountinfo') as f:
+        for line in f:
+            fields, _, fs_fields = line.rstrip('\n').partition(' - ')
+            fields = fields.split(' ')
+            mount_point = re.sub(r'\\([0-7]{3})', lambda m: chr(int(m.group(1), 8)), fields[4])
+            if mount_point != path:
+                continue
+            fstype, source, super_options = (fs_fields.split(' ') + ['', '', ''])[:3]
+            entry = (source, fstype, ','.join(o for o in (fields[5], super_options) if o))
+    return entry
+
 def check_secrets_mount():
     """Check if /secrets is mounted"""
     try:
-        # Check if /secrets is mounted
-        result = subprocess.run(['mountpoint', '-q', '/secrets'], 
-                              capture_output=True, text=True, timeout=5)
-        is_mounted = result.returncode == 0
-        
-        # Get mount details if mounted
-        mount_details = None
-        if is_mounted:
-            try:
-                mount_result = subprocess.run(['findmnt', '-n', '-o', 'SOURCE,FSTYPE,OPTIONS', '/secrets'], 
-                                            capture_output=True, text=True, timeout=5)
-                if mount_result.returncode == 0:
-                    mount_details = mount_result.stdout.strip()
-            except:
-                pass
+        # Check if /secrets is mounted, and get mount details if so
+        mount_entry = _mountinfo_entry('/secrets')
+        is_mounted = mount_entry is not None
+        mount_details = ' '.join(mount_entry) if is_mounted else None
         
         # Check if secrets directory exists and is accessible
         secrets_accessible = False
@@ -1126,13 +1763,16 @@ def check_open_webui():
         if webui_port_open:
             try:
                 # Try health check endpoint
-                health_response = requests.get('http://localhost:8380/health', timeout=5)
+                health_response = HTTP_SESSION.get('http://localhost:8380/health', timeout=PROBE_TIMEOUT)
                 if health_response.status_code == 200:
                     webui_healthy = True
                     try:
                         health_data = health_response.json()
+                    except ValueError:
+                        health_data = None
+                    if isinstance(health_data, dict):
                         webui_version = health_data.get('version', 'unknown')
-                    except:
+                    else:
                         webui_version = 'unknown'
                 else:
                     webui_error = f'Open-WebUI health check returned HTTP {health_response.status_code}'
@@ -1189,49 +1829,36 @@ def check_open_webui():
             'details': {'message': f'Open-WebUI check failed: {str(e)}'}
         }
 
-def is_storage_leader():
-    """Check if this node is the current storage leader"""
+def _etcd_flag(key, expected):
+    """True if key holds expected; False if it doesn't or etcd is unreachable."""
     if not is_etcd_node():
         return False
-    try:
-        client = get_etcd_client()
-        result = client.get('/cluster/leader/app')
-        if result[0]:
-            leader = result[0].decode()
-            return leader == platform.node()
-        return False
-    except:
-        return False
+    mirrored = etcd_mirrored(key)
+    if mirrored is not None:
+        value = mirrored[0]
+    else:
+        try:
+            value = etcd_get(key)
+        except ETCD_ERRORS as e:
+            print(f"etcd read of {key} failed: {e}", file=sys.stderr)
+            return False
+    return value is not None and value.decode() == expected
+
+def is_storage_leader():
+    """Check if this node is the current storage leader"""
+    return _etcd_flag('/cluster/leader/app', LOCAL_HOSTNAME)
 
 def is_dhcp_leader():
     """Check if this node is the current DHCP leader"""
-    if not is_etcd_node():
-        return False
-    try:
-        client = get_etcd_client()
-        result = client.get('/cluster/leader/dhcp')
-        if result[0]:
-            leader = result[0].decode()
-            return leader == platform.node()
-        return False
-    except:
-        return False
+    return _etcd_flag('/cluster/leader/dhcp', LOCAL_HOSTNAME)
 
 def is_node_drained():
     """Check if this node is drained"""
-    if not is_etcd_node():
-        return False
-    try:
-        hostname = platform.node()
-        client = get_etcd_client()
-        result = client.get(f'/cluster/nodes/{hostname}/drain')
-        return result[0] is not None and result[0].decode() == 'true'
-    except:
-        return False
+    return _etcd_flag(f'/cluster/nodes/{LOCAL_HOSTNAME}/drain', 'true')
 
 def get_current_node_type():
     """Determine the current node type based on hostname prefix"""
-    hostname = platform.node()
+    hostname = LOCAL_HOSTNAME
     if hostname and len(hostname) > 0:
         prefix = hostname[0]
         if prefix == 's':
@@ -1283,10 +1910,9 @@ def check_service_conditionally(health_status, service_name, check_func, require
 def drain_status():
     """Check drain status of this node"""
     try:
-        hostname = platform.node()
-        client = get_etcd_client()
-        result = client.get(f'/cluster/nodes/{hostname}/drain')
-        is_drained = result[0] is not None and result[0].decode() == 'true'
+        hostname = LOCAL_HOSTNAME
+        value = etcd_get(f'/cluster/nodes/{hostname}/drain')
+        is_drained = value is not None and value.decode() == 'true'
         return jsonify({'hostname': hostname, 'drained': is_drained})
     except Exception as e:
         return jsonify({'error': f'Failed to check drain status: {str(e)}'}), 500
@@ -1296,9 +1922,8 @@ def drain_status():
 def drain_status_target(target_hostname):
     """Check drain status of a specific node"""
     try:
-        client = get_etcd_client()
-        result = client.get(f'/cluster/nodes/{target_hostname}/drain')
-        is_drained = result[0] is not None and result[0].decode() == 'true'
+        value = etcd_get(f'/cluster/nodes/{target_hostname}/drain')
+        is_drained = value is not None and value.decode() == 'true'
         return jsonify({'hostname': target_hostname, 'drained': is_drained})
     except Exception as e:
         return jsonify({'error': f'Failed to check drain status for {target_hostname}: {str(e)}'}), 500
@@ -1401,15 +2026,19 @@ def inventory_export_csv():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# /api/ping is hit by the blackbox probes and by the squid check in every
+# health poll; it and /api/time skip jsonify and serialize straight to bytes.
+
 @app.route('/api/ping')
 def ping():
     """Simple ping endpoint for connectivity testing"""
-    return jsonify({'status': 'ok', 'timestamp': datetime.now(UTC).isoformat()})
+    return Response(orjson.dumps({'status': 'ok', 'timestamp': datetime.now(UTC).isoformat()}),
+                    mimetype='application/json')
 
 @app.route('/api/time')
 def get_time():
     """Get current timestamp for clock synchronization checks"""
-    return jsonify({'timestamp': time.time()})
+    return Response(orjson.dumps({'timestamp': time.time()}), mimetype='application/json')
 
 def get_mac_from_ip(client_ip):
     """
@@ -1421,36 +2050,82 @@ def get_mac_from_ip(client_ip):
     
     client = get_etcd_client()
 
-    # Look through DHCP leases in etcd
+    # The by-ip index names the MAC directly. It is only trusted if that
+    # MAC's lease still holds the IP (the MAC may have moved on since).
+    indexed_mac, _ = client.get(f'/cluster/dhcp/by-ip/{client_ip}')
+    if indexed_mac:
+        lease_value, _ = client.get(f'/cluster/dhcp/leases/{normalize_mac(indexed_mac.decode())}')
+        if lease_value:
+            try:
+                lease_data = orjson.loads(lease_value)
+            except orjson.JSONDecodeError:
+                # Corrupt lease record: fall through to the scan
+                lease_data = None
+            if isinstance(lease_data, dict) and lease_data.get('ip') == client_ip:
+                return lease_data.get('mac')
+
+    # Leases written before the index existed: scan them all
     for value, metadata in client.get_prefix('/cluster/dhcp/leases/'):
         if value:
             try:
-                lease_data = json.loads(value.decode())
+                lease_data = orjson.loads(value)
                 if lease_data.get('ip') == client_ip:
                     # Return non-normalized MAC (with colons) from lease data
                     return lease_data.get('mac')
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 # Skip non-JSON entries in the dhcp prefix
                 continue
 
     print("fallback to neighbor table", client_ip, file=sys.stderr)
+    return _neighbour_mac(client_ip)
+
+_MAC_RE = re.compile(r'^[0-9a-f]{2}(?::[0-9a-f]{2}){5}$', re.IGNORECASE)
+
+# Per-thread rtnetlink sockets for neighbour and address lookups.
+_netlink = threading.local()
+
+def _iproute():
+    """This thread's IPRoute socket. Callers reset _netlink.ipr on error."""
+    ipr = getattr(_netlink, 'ipr', None)
+    if ipr is None:
+        ipr = _netlink.ipr = IPRoute()
+    return ipr
 
-    # Fallback to neighbor table lookup using ip --json neigh
+def _neighbour_mac(client_ip):
+    """MAC (xx:xx:xx:xx:xx:xx) the kernel's neighbour table has for client_ip, or None."""
+    if IPRoute is None:
+        return _neighbour_mac_from_ip_command(client_ip)
+
+    try:
+        neighbours = _iproute().get_neighbours(dst=client_ip)
+    except Exception as e:
+        _netlink.ipr = None
+        print(f"neighbor table lookup failed for {client_ip}: {e}", file=sys.stderr)
+        return None
+    for neighbour in neighbours:
+        mac = neighbour.get_attr('NDA_LLADDR')
+        if neighbour.get_attr('NDA_DST') == client_ip and mac:
+            if _MAC_RE.match(mac):
+                return mac
+            print(f"MAC validation failed: {mac!r}", file=sys.stderr)
+    return None
+
+def _neighbour_mac_from_ip_command(client_ip):
+    """_neighbour_mac via `ip --json neigh`, for nodes without pyroute2."""
     result = None
     try:
         result = subprocess.run(['ip', '--json', 'neigh', 'show', client_ip], 
                               capture_output=True, text=True, timeout=5)
-        neighbors = json.loads(result.stdout)
+        neighbors = orjson.loads(result.stdout)
         for i, neighbor in enumerate(neighbors):
             print(f"neighbor {i}: {neighbor}", file=sys.stderr)
             if neighbor.get('dst') == client_ip and 'lladdr' in neighbor:
                 mac = neighbor['lladdr']
-                # Validate MAC format (should be xx:xx:xx:xx:xx:xx)
-                if isinstance(mac, str) and len(mac) == 17 and mac.count(':') == 5:
+                if isinstance(mac, str) and _MAC_RE.match(mac):
                     return mac
                 else:
                     print(f"MAC validation failed", file=sys.stderr)
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         print(f"neighbor table JSON parse error: {e}", file=sys.stderr)
         print(f"Raw stdout was: {result.stdout}", file=sys.stderr)
     except Exception as e:
@@ -1458,6 +2133,35 @@ def get_mac_from_ip(client_ip):
 
     return None
 
+SSH_KEY_PATH = '/opt/bootstrap-files/ansible_ssh_key.pub'
+
+# path -> (st_mtime_ns, parsed contents) for the small files the
+# provisioning endpoints embed in every response.
+_file_cache = {}
+
+def _cached_file(path, parse):
+    """parse() of path's contents, re-read only when its mtime changes."""
+    mtime = os.stat(path).st_mtime_ns
+    cached = _file_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(path, 'r') as f:
+        value = parse(f.read())
+    _file_cache[path] = (mtime, value)
+    return value
+
+def _shadow_password(shadow, user='ubuntu'):
+    for line in shadow.splitlines():
+        fields = line.split(':')
+        if fields[0] == user and len(fields) > 1:
+            return fields[1]
+    return None
+
+# MAC -> (template context, rendered user-data). The allocation is still
+# looked up on every request (a first boot creates it), but an unchanged
+# context is served without rendering again.
+_user_data_cache = {}
+
 @app.route('/autoinstall/meta-data')
 def serve_meta_data():
     """Serve empty meta-data for autoinstall"""
@@ -1494,20 +2198,13 @@ def serve_user_data():
     interfaces = NODE_TYPE_INTERFACES.get(node_type, NODE_TYPE_INTERFACES['unknown'])
     
     # Get SSH public key content
-    ssh_key_path = '/opt/bootstrap-files/ansible_ssh_key.pub'
-    with open(ssh_key_path, 'r') as f:
-        ssh_key_content = f.read().strip()
+    ssh_key_content = _cached_file(SSH_KEY_PATH, str.strip)
 
     # Get crypted password for ubuntu user (env var takes precedence for dev)
     ubuntu_password = os.environ.get('UBUNTU_PASSWORD_HASH')
     if not ubuntu_password:
         try:
-            with open('/etc/shadow', 'r') as f:
-                for line in f:
-                    fields = line.strip().split(':')
-                    if fields[0] == 'ubuntu' and len(fields) > 1:
-                        ubuntu_password = fields[1]
-                        break
+            ubuntu_password = _cached_file('/etc/shadow', _shadow_password)
         except (PermissionError, FileNotFoundError):
             raise Exception("Cannot read ubuntu password from /etc/shadow - set UBUNTU_PASSWORD_HASH env var or check permissions")
 
@@ -1516,6 +2213,24 @@ def serve_user_data():
 
     proxy_url = 'http://10.0.0.254:3128'
 
+    context = dict(
+        node_type=node_type,
+        hostname=hostname,
+        ip_address=ip_address,
+        amt_ip_address=amt_ip_address,
+        cluster_interface=interfaces['cluster_interface'],
+        uplink_interface=interfaces['uplink_interface'],
+        amt_interface=interfaces['amt_interface'],
+        ssh_key_content=ssh_key_content,
+        ubuntu_password=ubuntu_password,
+        proxy_url=proxy_url
+    )
+    # PXE clients retry; the output only changes when an input does
+    cached = _user_data_cache.get(normalize_mac(mac_address))
+    if cached is not None and cached[0] == context:
+        print(f"Serving cached user-data for {hostname}", file=sys.stderr)
+        return cached[1], 200, {'Content-Type': 'text/plain'}
+
     # Log template variables
     print(f"Generating user-data for {hostname}:", file=sys.stderr)
     print(f"  node_type: {node_type}", file=sys.stderr)
@@ -1527,24 +2242,11 @@ def serve_user_data():
     print(f"  proxy_url: {proxy_url}", file=sys.stderr)
     print(f"  ubuntu_password: {'(from env)' if os.environ.get('UBUNTU_PASSWORD_HASH') else '(from shadow)'}", file=sys.stderr)
 
-    # Read and render template
-    with open(AUTOINSTALL_USER_DATA_TEMPLATE, 'r') as f:
-        template_content = f.read()
+    # Render template
+    template = provisioning_template(AUTOINSTALL_USER_DATA_TEMPLATE)
+    rendered_content = template.render(**context)
+    _user_data_cache[normalize_mac(mac_address)] = (context, rendered_content)
 
-    template = Template(template_content)
-    rendered_content = template.render(
-        node_type=node_type,
-        hostname=hostname,
-        ip_address=ip_address,
-        amt_ip_address=amt_ip_address,
-        cluster_interface=interfaces['cluster_interface'],
-        uplink_interface=interfaces['uplink_interface'],
-        amt_interface=interfaces['amt_interface'],
-        ssh_key_content=ssh_key_content,
-        ubuntu_password=ubuntu_password,
-        proxy_url=proxy_url
-    )
-    
     return rendered_content, 200, {'Content-Type': 'text/plain'}
 
 
@@ -1616,15 +2318,10 @@ def serve_bootstrap(node_type):
         api_server = f"http://{request.host}"
 
     # Get SSH public key content
-    ssh_key_path = '/opt/bootstrap-files/ansible_ssh_key.pub'
-    with open(ssh_key_path, 'r') as f:
-        ssh_key_content = f.read().strip()
+    ssh_key_content = _cached_file(SSH_KEY_PATH, str.strip)
 
-    # Read and render template
-    with open(BOOTSTRAP_TEMPLATES[node_type], 'r') as f:
-        template_content = f.read()
-
-    template = Template(template_content)
+    # Render template
+    template = provisioning_template(BOOTSTRAP_TEMPLATES[node_type])
     rendered_content = template.render(
         api_server=api_server,
         ssh_key_content=ssh_key_content
@@ -1642,13 +2339,13 @@ def prometheus_metrics():
     """Prometheus metrics endpoint"""
     try:
         # Get health data
-        health_data = get_comprehensive_health()
+        health_data = shared_comprehensive_health()
         
         metrics = []
         
         # Overall health metric
         overall_value = 1 if health_data['overall'] == 'healthy' else 0
-        metrics.append(f'ycluster_node_healthy{{node="{platform.node()}"}} {overall_value}')
+        metrics.append(f'ycluster_node_healthy{{node="{LOCAL_HOSTNAME}"}} {overall_value}')
         
         # Service health metrics
         for service, details in health_data.get('services', {}).items():
@@ -1663,39 +2360,39 @@ def prometheus_metrics():
                 service_value = 3
             else:
                 service_value = 2
-            metrics.append(f'ycluster_service_health{{node="{platform.node()}",service="{service}"}} {service_value}')
+            metrics.append(f'ycluster_service_health{{node="{LOCAL_HOSTNAME}",service="{service}"}} {service_value}')
             
             # Service-specific metrics
             if service == 'ceph' and isinstance(details.get('details'), dict):
                 # Ceph status could be healthy/degraded/unhealthy
                 ceph_status = details['details']
                 if ceph_status == 'HEALTH_OK':
-                    metrics.append(f'ycluster_ceph_health{{node="{platform.node()}"}} 1')
+                    metrics.append(f'ycluster_ceph_health{{node="{LOCAL_HOSTNAME}"}} 1')
                 else:
-                    metrics.append(f'ycluster_ceph_health{{node="{platform.node()}"}} 0')
+                    metrics.append(f'ycluster_ceph_health{{node="{LOCAL_HOSTNAME}"}} 0')
         
         # Leadership metrics
         storage_leader = 1 if health_data.get('storage_leader', False) else 0
         dhcp_leader = 1 if health_data.get('dhcp_leader', False) else 0
-        metrics.append(f'ycluster_storage_leader{{node="{platform.node()}"}} {storage_leader}')
-        metrics.append(f'ycluster_dhcp_leader{{node="{platform.node()}"}} {dhcp_leader}')
+        metrics.append(f'ycluster_storage_leader{{node="{LOCAL_HOSTNAME}"}} {storage_leader}')
+        metrics.append(f'ycluster_dhcp_leader{{node="{LOCAL_HOSTNAME}"}} {dhcp_leader}')
         
         # VIP metrics
         vip_status = check_vip_status()
         gateway_vip_active = 1 if vip_status['gateway_vip']['active'] else 0
         storage_vip_active = 1 if vip_status['storage_vip']['active'] else 0
-        metrics.append(f'ycluster_vip_active{{node="{platform.node()}",vip="gateway"}} {gateway_vip_active}')
-        metrics.append(f'ycluster_vip_active{{node="{platform.node()}",vip="storage"}} {storage_vip_active}')
+        metrics.append(f'ycluster_vip_active{{node="{LOCAL_HOSTNAME}",vip="gateway"}} {gateway_vip_active}')
+        metrics.append(f'ycluster_vip_active{{node="{LOCAL_HOSTNAME}",vip="storage"}} {storage_vip_active}')
         
         # Certificate expiry metrics
         cert_status = check_certificate_expiry()
         if cert_status.get('details', {}).get('days_until_expiry') is not None:
             days_until_expiry = cert_status['details']['days_until_expiry']
-            metrics.append(f'ycluster_certificate_days_until_expiry{{node="{platform.node()}"}} {days_until_expiry}')
+            metrics.append(f'ycluster_certificate_days_until_expiry{{node="{LOCAL_HOSTNAME}"}} {days_until_expiry}')
         
         # Node drain status
         drained = 1 if health_data.get('drained', False) else 0
-        metrics.append(f'ycluster_node_drained{{node="{platform.node()}"}} {drained}')
+        metrics.append(f'ycluster_node_drained{{node="{LOCAL_HOSTNAME}"}} {drained}')
         
         # Return metrics in Prometheus format
         response = '\n'.join(metrics) + '\n'
@@ -1703,9 +2400,111 @@ def prometheus_metrics():
         
     except Exception as e:
         # Return error metric
-        error_response = f'ycluster_metrics_error{{node="{platform.node()}"}} 1\n'
+        error_response = f'ycluster_metrics_error{{node="{LOCAL_HOSTNAME}"}} 1\n'
         return error_response, 500, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
 
+# Worker pool for the probes in get_comprehensive_health(). They are
+# dominated by subprocess and network waits, so running them side by side
+# brings the endpoint's latency down to roughly the slowest probe instead of
+# the sum of all of them. Each health request gets CHECK_BUDGET seconds in
+# total; probes still running then are reported as failed. The budget stays
+# well under the 10s read timeout cluster-status uses for /api/health, so a
+# single slow probe is reported as such instead of timing out the whole node.
+CHECK_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix='health-check')
+CHECK_BUDGET = 8
+
+
+def _probe_result(future, deadline, default):
+    """Wait for a pooled probe until deadline; default if it overruns."""
+    try:
+        return future.result(timeout=max(0, deadline - time.monotonic()))
+    except FutureTimeout:
+        return default
+
+
+def _check_result(future, name, deadline):
+    """Wait for a pooled check; a check that overruns reports as an error."""
+    return _probe_result(future, deadline, {
+        'status': 'error',
+        'details': {'message': f'{name} check did not finish within the '
+                               f'{CHECK_BUDGET}s health budget'}
+    })
+
+
+def _check_squid_proxy():
+    """Fetch our own ping endpoint through Squid; None if it works, else the error."""
+    try:
+        proxy_response = HTTP_SESSION.get(
+            'http://localhost:12723/api/ping',
+            proxies={'http': 'http://localhost:3128'},
+            timeout=PROBE_TIMEOUT
+        )
+        if proxy_response.status_code in [200, 503]:
+            return None
+        return f'HTTP {proxy_response.status_code}'
+    except requests.exceptions.ProxyError as e:
+        return f'Proxy error: {str(e)}'
+    except requests.exceptions.Timeout:
+        return 'Proxy timeout'
+    except Exception as e:
+        return f'Proxy test failed: {str(e)}'
+
+
+def _check_etcd():
+    """Health entry for this node's etcd connectivity.
+
+    Uses the Maintenance.Status RPC, which the member answers from memory,
+    rather than a key read that goes through MVCC and the backend.
+    """
+    client = None
+    try:
+        client = get_etcd_client()
+        status = client.status()
+        return {
+            'status': 'healthy',
+            'details': {
+                'message': 'connected',
+                'version': status.version,
+                'raft_index': status.raft_index,
+                'raft_term': status.raft_term,
+            }
+        }
+    except Exception as e:
+        if client is not None:
+            etcd_pool().discard(client)
+        return {'status': 'unhealthy', 'details': {'error': str(e)}}
+
+
+# The get_comprehensive_health() run currently in progress, if any.
+_health_lock = threading.Lock()
+_health_in_flight = None
+
+
+def shared_comprehensive_health():
+    """get_comprehensive_health(), joining a run that is already in progress.
+
+    /api/health and /metrics are polled concurrently (Prometheus, every
+    node's cluster-status fan-out, the status page). Callers that arrive
+    while a run is going wait for its result instead of starting their own
+    set of probes. The result is shared, so callers must not modify it.
+    """
+    global _health_in_flight
+    with _health_lock:
+        future = _health_in_flight
+        running = future is None
+        if running:
+            future = _health_in_flight = Future()
+    if running:
+        try:
+            future.set_result(get_comprehensive_health())
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with _health_lock:
+                _health_in_flight = None
+    return future.result()
+
+
 def get_comprehensive_health():
     """Get comprehensive health data (extracted from health() function)"""
     health_status = {
@@ -1717,16 +2516,56 @@ def get_comprehensive_health():
     current_node_type = get_current_node_type()
     is_storage_node = current_node_type == 'storage'
 
+    # Start every probe now; results are collected below, in the same order
+    # the services are reported, against one shared deadline. Leadership
+    # and drain state are read once here and reused throughout.
+    deadline = time.monotonic() + CHECK_BUDGET
+    submit = CHECK_POOL.submit
+    pending = {
+        'dns': submit(check_dns_status),
+        'tls_certificate': submit(check_certificate_expiry),
+        'clock_skew': submit(check_clock_skew),
+        'docker_registry': submit(check_docker_registry),
+        'open_webui': submit(check_open_webui),
+    }
+    if is_storage_node:
+        pending['ceph'] = submit(check_ceph_status)
+        pending['docker_daemon'] = submit(check_docker_daemon)
+        pending['tang'] = submit(check_tang_service)
+        pending['secrets_mount'] = submit(check_secrets_mount)
+    if is_etcd_node():
+        pending['etcd'] = submit(_check_etcd)
+    probes = {
+        'storage_leader': submit(is_storage_leader),
+        'dhcp_leader': submit(is_dhcp_leader),
+        'drained': submit(is_node_drained),
+        'postgres_running': submit(check_service_status, 'postgresql@16-main'),
+        'ports': submit(check_ports_open, 'localhost', [5432, 6333, 8067, 3128, 2333]),
+        'qdrant_running': submit(check_service_status, 'qdrant'),
+        'squid_running': submit(check_service_status, 'squid'),
+        'squid_proxy': submit(_check_squid_proxy),
+        'ntp_running': submit(check_service_status, 'ntp'),
+        'chrony_running': submit(check_service_status, 'chrony'),
+        'rathole_running': submit(check_service_status, 'rathole'),
+        'keepalived_running': submit(check_service_status, 'keepalived'),
+        'vip': submit(check_vip_status),
+    }
+    if is_storage_node:
+        probes['storage_leader_election'] = submit(check_service_status, 'storage-leader-election')
+        probes['dhcp_leader_election'] = submit(check_service_status, 'dhcp-leader-election')
+
+    def probe(name, default=False):
+        return _probe_result(probes[name], deadline, default)
+
+    ports = probe('ports', {})
+
     # Check etcd — only storage (s*) nodes talk to etcd. Non-storage admin-api
     # instances hold no etcd client (etcd is firewalled to s*), so probing it
     # here would be both meaningless and a connection we deliberately removed.
     if is_etcd_node():
-        try:
-            client = get_etcd_client()
-            client.get('/test')
-            health_status['services']['etcd'] = {'status': 'healthy', 'details': 'connected'}
-        except Exception as e:
-            health_status['services']['etcd'] = {'status': 'unhealthy', 'details': str(e)}
+        etcd_health = _check_result(pending['etcd'], 'etcd', deadline)
+        health_status['services']['etcd'] = etcd_health
+        if etcd_health['status'] != 'healthy':
             health_status['overall'] = 'unhealthy'
     else:
         health_status['services']['etcd'] = {
@@ -1736,7 +2575,7 @@ def get_comprehensive_health():
     
     # Check Ceph storage (only on storage nodes)
     if is_storage_node:
-        ceph_health = check_ceph_status()
+        ceph_health = _check_result(pending['ceph'], 'ceph', deadline)
         health_status['services']['ceph'] = ceph_health
         if ceph_health['status'] not in ['healthy', 'degraded']:
             health_status['overall'] = 'unhealthy'
@@ -1747,9 +2586,9 @@ def get_comprehensive_health():
         }
     
     # Check PostgreSQL (always check, flag split-brain if running on non-leader)
-    postgres_running = check_service_status('postgresql@16-main')
-    postgres_port = check_port_open('localhost', 5432)
-    is_storage_lead = is_storage_leader()
+    postgres_running = probe('postgres_running')
+    postgres_port = ports.get(5432, False)
+    is_storage_lead = probe('storage_leader')
     
     if is_storage_lead:
         postgres_healthy = postgres_running and postgres_port
@@ -1789,8 +2628,8 @@ def get_comprehensive_health():
             }
     
     # Check Qdrant (always check, flag split-brain if running on non-leader)
-    qdrant_running = check_service_status('qdrant')
-    qdrant_port = check_port_open('localhost', 6333)
+    qdrant_running = probe('qdrant_running')
+    qdrant_port = ports.get(6333, False)
     
     if is_storage_lead:
         qdrant_healthy = qdrant_running and qdrant_port
@@ -1830,12 +2669,9 @@ def get_comprehensive_health():
             }
     
     # Check storage-only services (storage_leader_election, dhcp_leader_election)
-    for service_name, systemd_name in [
-        ('storage_leader_election', 'storage-leader-election'),
-        ('dhcp_leader_election', 'dhcp-leader-election')
-    ]:
+    for service_name in ['storage_leader_election', 'dhcp_leader_election']:
         if is_storage_node:
-            service_running = check_service_status(systemd_name)
+            service_running = probe(service_name)
             health_status['services'][service_name] = {
                 'status': 'healthy' if service_running else 'unhealthy',
                 'details': {'service_active': service_running}
@@ -1849,8 +2685,8 @@ def get_comprehensive_health():
             }
     
     # Check DHCP (only required if we are DHCP leader)
-    is_dhcp_lead = is_dhcp_leader()
-    dhcp_port = check_port_open('localhost', 8067)  # DHCP health port
+    is_dhcp_lead = probe('dhcp_leader')
+    dhcp_port = ports.get(8067, False)  # DHCP health port
     
     if is_dhcp_lead:
         health_status['services']['dhcp'] = {
@@ -1886,36 +2722,22 @@ def get_comprehensive_health():
             }
     
     # Check DNS (dnsmasq)
-    dns_health = check_dns_status()
+    dns_health = _check_result(pending['dns'], 'dns', deadline)
     health_status['services']['dns'] = dns_health
     if dns_health['status'] == 'unhealthy':
         health_status['overall'] = 'unhealthy'
     
     # Check Squid proxy
-    squid_running = check_service_status('squid')
-    squid_port = check_port_open('localhost', 3128)
+    squid_running = probe('squid_running')
+    squid_port = ports.get(3128, False)
     squid_functional = False
     squid_error = None
     
     if squid_running and squid_port:
-        # Test actual proxy functionality using local ping endpoint
-        try:
-            # Test a simple HTTP request through the proxy to our own ping endpoint
-            proxy_response = requests.get(
-                'http://localhost:12723/api/ping',
-                proxies={'http': 'http://localhost:3128'},
-                timeout=5
-            )
-            if proxy_response.status_code in [200, 503]:
-                squid_functional = True
-            else:
-                squid_error = f'HTTP {proxy_response.status_code}'
-        except requests.exceptions.ProxyError as e:
-            squid_error = f'Proxy error: {str(e)}'
-        except requests.exceptions.Timeout:
-            squid_error = 'Proxy timeout'
-        except Exception as e:
-            squid_error = f'Proxy test failed: {str(e)}'
+        squid_error = probe('squid_proxy',
+                            f'Proxy test did not finish within the '
+                            f'{CHECK_BUDGET}s health budget')
+        squid_functional = squid_error is None
     
     squid_healthy = squid_running and squid_port and squid_functional
     health_status['services']['squid'] = {
@@ -1931,7 +2753,7 @@ def get_comprehensive_health():
         health_status['overall'] = 'unhealthy'
     
     # Check NTP
-    ntp_running = check_service_status('ntp') or check_service_status('chrony')
+    ntp_running = probe('ntp_running') or probe('chrony_running')
     health_status['services']['ntp'] = {
         'status': 'healthy' if ntp_running else 'unhealthy',
         'details': {'service_active': ntp_running}
@@ -1940,7 +2762,7 @@ def get_comprehensive_health():
         health_status['overall'] = 'unhealthy'
     
     # Check TLS certificate expiry
-    cert_health = check_certificate_expiry()
+    cert_health = _check_result(pending['tls_certificate'], 'tls_certificate', deadline)
     health_status['services']['tls_certificate'] = cert_health
     if cert_health['status'] in ['expired', 'critical']:
         health_status['overall'] = 'unhealthy'
@@ -1948,8 +2770,8 @@ def get_comprehensive_health():
         health_status['overall'] = 'degraded'
     
     # Check rathole (only required if we are storage leader)
-    rathole_running = check_service_status('rathole')
-    rathole_port = check_port_open('localhost', 2333)  # Default rathole client port
+    rathole_running = probe('rathole_running')
+    rathole_port = ports.get(2333, False)  # Default rathole client port
     
     if is_storage_lead:
         rathole_healthy = rathole_running
@@ -1989,7 +2811,7 @@ def get_comprehensive_health():
             }
     
     # Check clock skew
-    clock_skew = check_clock_skew()
+    clock_skew = _check_result(pending['clock_skew'], 'clock_skew', deadline)
     health_status['services']['clock_skew'] = clock_skew
     if clock_skew['status'] in ['critical', 'error']:
         health_status['overall'] = 'unhealthy'
@@ -1998,7 +2820,7 @@ def get_comprehensive_health():
     
     # Check Docker daemon (only on storage nodes)
     if is_storage_node:
-        docker_daemon = check_docker_daemon()
+        docker_daemon = _check_result(pending['docker_daemon'], 'docker_daemon', deadline)
         health_status['services']['docker_daemon'] = docker_daemon
         if docker_daemon['status'] in ['unhealthy', 'error']:
             health_status['overall'] = 'unhealthy'
@@ -2011,7 +2833,7 @@ def get_comprehensive_health():
         }
     
     # Check Docker registry
-    docker_registry = check_docker_registry()
+    docker_registry = _check_result(pending['docker_registry'], 'docker_registry', deadline)
     health_status['services']['docker_registry'] = docker_registry
     if docker_registry['status'] in ['unhealthy', 'error']:
         health_status['overall'] = 'unhealthy'
@@ -2019,12 +2841,9 @@ def get_comprehensive_health():
         health_status['overall'] = 'degraded'
     
     # Check storage-only services with complex health checks (tang, secrets_mount)
-    for service_name, check_func in [
-        ('tang', check_tang_service),
-        ('secrets_mount', check_secrets_mount)
-    ]:
+    for service_name in ['tang', 'secrets_mount']:
         if is_storage_node:
-            service_result = check_func()
+            service_result = _check_result(pending[service_name], service_name, deadline)
             health_status['services'][service_name] = service_result
             if service_result['status'] in ['unhealthy', 'error']:
                 health_status['overall'] = 'unhealthy'
@@ -2037,7 +2856,7 @@ def get_comprehensive_health():
             }
     
     # Check Open-WebUI
-    open_webui = check_open_webui()
+    open_webui = _check_result(pending['open_webui'], 'open_webui', deadline)
     health_status['services']['open_webui'] = open_webui
     if open_webui['status'] in ['unhealthy', 'error']:
         health_status['overall'] = 'unhealthy'
@@ -2045,7 +2864,10 @@ def get_comprehensive_health():
         health_status['overall'] = 'degraded'
     
     # Check VIP status
-    vip_health = check_vip_status()
+    vip_health = probe('vip', {
+        'gateway_vip': {'active': False, 'error': 'VIP check did not finish in time'},
+        'storage_vip': {'active': False, 'error': 'VIP check did not finish in time'},
+    })
     gateway_vip_active = vip_health['gateway_vip']['active']
     storage_vip_active = vip_health['storage_vip']['active']
     
@@ -2062,9 +2884,9 @@ def get_comprehensive_health():
     # Check keepalived service (only on core nodes). Short-circuit on
     # non-storage nodes so get_core_nodes() (an etcd read) only runs where an
     # etcd client exists — non-core nodes are never core. etcd is core-only.
-    current_hostname = platform.node()
+    current_hostname = LOCAL_HOSTNAME
+    keepalived_running = probe('keepalived_running')
     if is_etcd_node() and current_hostname in get_core_nodes():
-        keepalived_running = check_service_status('keepalived')
         health_status['services']['keepalived'] = {
             'status': 'healthy' if keepalived_running else 'unhealthy',
             'details': {'service_active': keepalived_running}
@@ -2073,7 +2895,6 @@ def get_comprehensive_health():
             health_status['overall'] = 'unhealthy'
     else:
         # Not a core node - keepalived should not be running
-        keepalived_running = check_service_status('keepalived')
         if keepalived_running:
             health_status['services']['keepalived'] = {
                 'status': 'unhealthy',
@@ -2093,20 +2914,22 @@ def get_comprehensive_health():
             }
     
     # Add leadership status for this node
-    health_status['storage_leader'] = is_storage_leader()
-    health_status['dhcp_leader'] = is_dhcp_leader()
-    health_status['drained'] = is_node_drained()
+    health_status['storage_leader'] = is_storage_lead
+    health_status['dhcp_leader'] = is_dhcp_lead
+    health_status['drained'] = probe('drained')
     
     return health_status
 
 @app.route('/api/health')
 def health():
     """Comprehensive health check endpoint for all services"""
-    health_status = get_comprehensive_health()
+    health_status = shared_comprehensive_health()
 
     # Return appropriate HTTP status code
     status_code = 200 if health_status['overall'] == 'healthy' else 503
-    return jsonify(health_status), status_code
+    # Polled by every node's cluster-status fan-out and by Prometheus;
+    # orjson skips jsonify's key sorting and pure-Python encoding.
+    return Response(orjson.dumps(health_status), status=status_code, mimetype='application/json')
 
 @app.route('/api/alert-webhook', methods=['POST'])
 def alert_webhook():
@@ -2144,56 +2967,62 @@ def get_core_nodes():
             if h.get('type') == 'storage' and not h.get('disabled')]
 
 
-def get_all_hosts():
-    """Get all hosts from etcd allocations"""
-    try:
-        client = get_etcd_client()
-        hosts = []
+def _static_hosts(records):
+    """Sorted host entries for the static-prefix allocations in records."""
+    keyed = []
+    for allocation in records:
+        try:
+            hostname = allocation['hostname']
 
-        # Get all allocations from by-hostname
-        for value, metadata in client.get_prefix(f"{ETCD_PREFIX}/by-hostname/"):
-            if not value:
+            # Skip AMT interfaces (hostnames ending with 'a').
+            if hostname.endswith('a'):
+                continue
+
+            # Keep only static-prefix allocations: letters followed
+            # by digits (e.g. s3, c1, m2, nv1, nas1). Dynamic-IP
+            # allocations (dhcp-NNN, etc.) don't match and are
+            # excluded.
+            m = _STATIC_HOSTNAME_RE.match(hostname)
+            if not m:
                 continue
-            try:
-                allocation = json.loads(value.decode())
-                hostname = allocation['hostname']
-
-                # Skip AMT interfaces (hostnames ending with 'a').
-                if hostname.endswith('a'):
-                    continue
-
-                # Keep only static-prefix allocations: letters followed
-                # by digits (e.g. s3, c1, m2, nv1, nas1). Dynamic-IP
-                # allocations (dhcp-NNN, etc.) don't match and are
-                # excluded.
-                if not _STATIC_HOSTNAME_RE.match(hostname):
-                    continue
-
-                hosts.append({
-                    'hostname': hostname,
-                    'ip': allocation['ip'],
-                    'type': allocation['type'],
-                    'disabled': allocation.get('disabled', False)
-                })
-            except Exception:
-                pass
 
+            host = {
+                'hostname': hostname,
+                'ip': allocation['ip'],
+                'type': allocation['type'],
+                'disabled': allocation.get('disabled', False)
+            }
+        except (KeyError, TypeError):
+            continue
         # Sort by (type, numeric suffix). Prefix length varies (s, nv,
-        # nas), so parse the number via the regex instead of assuming
+        # nas), so use the number the regex parsed rather than
         # hostname[1:].
-        def _sort_key(h):
-            m = _STATIC_HOSTNAME_RE.match(h['hostname'])
-            return (h['type'], int(m.group(2)) if m else 0)
+        keyed.append((host['type'], int(m.group(2)), hostname, host))
 
-        hosts.sort(key=_sort_key)
-        return hosts
-    except Exception:
+    keyed.sort(key=lambda entry: entry[:3])
+    return [host for *_, host in keyed]
+
+def get_all_hosts():
+    """Get all hosts from etcd allocations.
+
+    The list is rebuilt only when an allocation changes; the host dicts are
+    shared between callers and must not be modified.
+    """
+    try:
+        return list(allocation_view('all-hosts', _static_hosts))
+    except ETCD_ERRORS as e:
+        print(f"host list unavailable: {e}", file=sys.stderr)
         return []
 
-def get_host_health(host_ip, timeout=10):
-    """Get health status from a specific host"""
+def get_host_health(host_ip, timeout=(0.5, 10)):
+    """Get health status from a specific host.
+
+    The short connect timeout (with some slack for LAN jitter over the
+    local probes) fails powered-off nodes fast; the read
+    timeout leaves room for the node's own health checks to run.
+    """
     try:
-        response = requests.get(f"http://{host_ip}:12723/api/health", timeout=timeout)
+        response = HTTP_SESSION.get(f"http://{host_ip}:12723/api/health", timeout=timeout)
         if response.status_code in [200, 503]:
             # Both 200 (healthy) and 503 (unhealthy) contain valid health data
             return response.json()
@@ -2206,8 +3035,32 @@ def get_host_health(host_ip, timeout=10):
     except Exception as e:
         return {'overall': 'error', 'services': {}, 'error': str(e)}
 
+def _local_ipv4_addresses():
+    """Map each IPv4 address configured on this node to its interface name.
+
+    One dump of the kernel's address table, so every VIP is looked up in
+    the same snapshot.
+    """
+    if IPRoute is None:
+        result = subprocess.run(['ip', '-j', '-4', 'addr', 'show'],
+                                capture_output=True, text=True, timeout=5)
+        if result.returncode != 0 or not result.stdout.strip():
+            return {}
+        return {addr.get('local'): interface.get('ifname')
+                for interface in orjson.loads(result.stdout)
+                for addr in interface.get('addr_info', [])}
+
+    try:
+        ipr = _iproute()
+        names = {link['index']: link.get_attr('IFLA_IFNAME') for link in ipr.get_links()}
+        return {addr.get_attr('IFA_ADDRESS'): names.get(addr['index'])
+                for addr in ipr.get_addr(family=socket.AF_INET)}
+    except Exception:
+        _netlink.ipr = None
+        raise
+
 def check_vip_status():
-    """Check VIP status using keepalived and ip commands"""
+    """Check VIP status using keepalived and the kernel's address table"""
     gateway_vip_ip = '10.0.0.254'
     storage_vip_ip = '10.0.0.100'
     vip_status = {
@@ -2225,47 +3078,22 @@ def check_vip_status():
         }
     }
     
-    # Check gateway VIP
-    try:
-        # Use 'ip -j addr show to <vip>' to get JSON output for reliable parsing
-        result = subprocess.run(['ip', '-j', 'addr', 'show', 'to', gateway_vip_ip], 
-                              capture_output=True, text=True, timeout=5)
-        if result.returncode == 0 and result.stdout.strip():
-            # Parse JSON output - if there's any output, VIP is active on this node
-            interfaces = json.loads(result.stdout)
-            if interfaces:
-                # VIP is assigned to this node
-                vip_status['gateway_vip']['active'] = True
-                vip_status['gateway_vip']['master'] = platform.node()
-                # Get interface name from first interface in results
-                vip_status['gateway_vip']['interface'] = interfaces[0].get('ifname')
-        else:
-            # No output means VIP is not assigned to this node
-            vip_status['gateway_vip']['active'] = False
-            
-    except json.JSONDecodeError as e:
-        vip_status['gateway_vip']['error'] = f'JSON parse error: {str(e)}'
-    except Exception as e:
-        vip_status['gateway_vip']['error'] = str(e)
-    
-    # Check storage VIP
     try:
-        result = subprocess.run(['ip', '-j', 'addr', 'show', 'to', storage_vip_ip], 
-                              capture_output=True, text=True, timeout=5)
-        if result.returncode == 0 and result.stdout.strip():
-            interfaces = json.loads(result.stdout)
-            if interfaces:
-                vip_status['storage_vip']['active'] = True
-                vip_status['storage_vip']['master'] = platform.node()
-                vip_status['storage_vip']['interface'] = interfaces[0].get('ifname')
-        else:
-            vip_status['storage_vip']['active'] = False
-            
-    except json.JSONDecodeError as e:
-        vip_status['storage_vip']['error'] = f'JSON parse error: {str(e)}'
+        addresses = _local_ipv4_addresses()
+        error = None
+    except orjson.JSONDecodeError as e:
+        error = f'JSON parse error: {str(e)}'
     except Exception as e:
-        vip_status['storage_vip']['error'] = str(e)
-    
+        error = str(e)
+    for vip in ('gateway_vip', 'storage_vip'):
+        if error is not None:
+            vip_status[vip]['error'] = error
+        elif vip_status[vip]['ip'] in addresses:
+            # VIP is assigned to this node
+            vip_status[vip]['active'] = True
+            vip_status[vip]['master'] = LOCAL_HOSTNAME
+            vip_status[vip]['interface'] = addresses[vip_status[vip]['ip']]
+
     # Check keepalived service status
     try:
         keepalived_running = check_service_status('keepalived')
@@ -2282,8 +3110,11 @@ def check_vip_status():
     
     return vip_status
 
-def get_cluster_vip_status(host_health):
-    """Get VIP status across all cluster nodes from existing health data"""
+def get_cluster_vip_status(host_health, all_hosts=None):
+    """Get VIP status across all cluster nodes from existing health data
+
+    all_hosts is get_all_hosts()'s result, if the caller already has it.
+    """
     vip_info = {
         'gateway_vip': {
             'ip': '10.0.0.254',
@@ -2300,13 +3131,15 @@ def get_cluster_vip_status(host_health):
         'keepalived_nodes': []  # Single list for keepalived status across all nodes
     }
     
-    # Get all hosts to find core nodes
-    all_hosts = get_all_hosts()
+    # Index all hosts by name to find core nodes
+    if all_hosts is None:
+        all_hosts = get_all_hosts()
+    hosts_by_name = {host['hostname']: host for host in all_hosts}
     
     # Process only core nodes (where keepalived runs and VIPs can be active)
     for core_node in get_core_nodes():
         # Find the core node in all_hosts to get its IP
-        core_host = next((host for host in all_hosts if host['hostname'] == core_node), None)
+        core_host = hosts_by_name.get(core_node)
         if not core_host:
             # Core node not found in allocations - add as missing
             vip_info['keepalived_nodes'].append({
@@ -2367,26 +3200,27 @@ def get_cluster_vip_status(host_health):
     return vip_info
 
 
+@_ttl_cached
 def get_leadership_status():
     """Get current leadership status from etcd"""
     try:
-        client = get_etcd_client()
         leadership = {}
-        
-        # Get storage leader
-        result = client.get('/cluster/leader/app')
-        if result[0]:
-            storage_leader = result[0].decode()
-            leadership['storage_leader'] = storage_leader
-        
-        # Get DHCP leader
-        result = client.get('/cluster/leader/dhcp')
-        if result[0]:
-            dhcp_leader = result[0].decode()
-            leadership['dhcp_leader'] = dhcp_leader
-            
+        keys = ['/cluster/leader/app', '/cluster/leader/dhcp']
+        mirrored = [etcd_mirrored(key) for key in keys]
+        if None in mirrored:
+            storage_leader, dhcp_leader = etcd_get_many(keys)
+        else:
+            storage_leader, dhcp_leader = (value for value, _ in mirrored)
+
+        if storage_leader:
+            leadership['storage_leader'] = storage_leader.decode()
+
+        if dhcp_leader:
+            leadership['dhcp_leader'] = dhcp_leader.decode()
+
         return leadership
-    except:
+    except ETCD_ERRORS as e:
+        print(f"etcd leadership lookup failed: {e}", file=sys.stderr)
         return {}
 
 # Prometheus http_sd_configs target definitions.
@@ -2444,7 +3278,7 @@ def get_inference_status():
     a dict (per-backend + per-model health) or None if the proxy is not
     running here."""
     try:
-        resp = requests.get('http://127.0.0.1:4001/healthz', timeout=3)
+        resp = HTTP_SESSION.get('http://127.0.0.1:4001/healthz', timeout=PROBE_TIMEOUT)
         if resp.status_code != 200:
             return None
         return resp.json()
@@ -2469,9 +3303,16 @@ def _scrub_adhoc_etcd(result):
     return result
 
 
+# Workers for the cluster-status fan-out to every node's /api/health. Wide
+# enough that the whole fleet is asked at once, so a scrape takes about as
+# long as the slowest node rather than several rounds of timeouts. Results
+# still outstanding after HOST_HEALTH_BUDGET seconds report as timeouts.
+HOST_HEALTH_POOL = ThreadPoolExecutor(max_workers=32, thread_name_prefix='host-health')
+HOST_HEALTH_BUDGET = 12
+
+
 def get_all_host_health(hosts):
     """Fetch health for all non-disabled hosts in parallel."""
-    from concurrent.futures import ThreadPoolExecutor, as_completed
     host_health = {}
     active = [h for h in hosts if not h.get('disabled', False)]
     types = {h['hostname']: h.get('type') for h in hosts}
@@ -2479,55 +3320,84 @@ def get_all_host_health(hosts):
         if h.get('disabled', False):
             host_health[h['hostname']] = {'status': 'disabled', 'services': []}
 
-    with ThreadPoolExecutor(max_workers=16) as executor:
-        futures = {executor.submit(get_host_health, h['ip']): h['hostname'] for h in active}
-        for future in as_completed(futures):
-            name = futures[future]
+    futures = {HOST_HEALTH_POOL.submit(get_host_health, h['ip']): h['hostname'] for h in active}
+    done, _ = wait(futures, timeout=HOST_HEALTH_BUDGET)
+    for future, name in futures.items():
+        if future in done:
             result = future.result()
-            if types.get(name) == 'adhoc':
-                result = _scrub_adhoc_etcd(result)
-            host_health[name] = result
+        else:
+            result = {'overall': 'timeout', 'services': {}, 'error': 'Request timeout'}
+        if types.get(name) == 'adhoc':
+            result = _scrub_adhoc_etcd(result)
+        host_health[name] = result
 
     return host_health
 
 
-@app.route('/api/cluster-status')
-def cluster_status_api():
-    """API endpoint returning cluster status as JSON"""
+# /api/cluster-status is polled by every open status page. Polls that
+# arrive while a build is running join it, and a finished body is reused
+# for CLUSTER_STATUS_MAX_AGE seconds, so concurrent viewers cost one
+# fan-out to the nodes instead of one each.
+CLUSTER_STATUS_MAX_AGE = 1
+_cluster_status_lock = threading.Lock()
+_cluster_status_in_flight = None
+_cluster_status_last = None  # (JSON body, built_at)
+
+
+def build_cluster_status():
+    """Serialized cluster status: hosts, per-host health, leadership, VIPs."""
     hosts = get_all_hosts()
-    leadership = get_leadership_status()
-    certificate_status = check_certificate_expiry()
+    # The local lookups are queued ahead of the per-node fetches, so they
+    # run while the fan-out waits on the network instead of before it.
+    leadership = HOST_HEALTH_POOL.submit(get_leadership_status)
+    certificate_status = HOST_HEALTH_POOL.submit(check_certificate_expiry)
+    inference_status = HOST_HEALTH_POOL.submit(get_inference_status)
     host_health = get_all_host_health(hosts)
-    vip_status = get_cluster_vip_status(host_health)
+    vip_status = get_cluster_vip_status(host_health, hosts)
 
-    return jsonify({
+    return orjson.dumps({
         'hosts': hosts,
         'hostHealth': host_health,
-        'leadership': leadership,
+        'leadership': leadership.result(),
         'vipStatus': vip_status,
-        'certificateStatus': certificate_status,
-        'inferenceStatus': get_inference_status(),
-        'respondingHostname': platform.node(),
+        'certificateStatus': certificate_status.result(),
+        'inferenceStatus': inference_status.result(),
+        'respondingHostname': LOCAL_HOSTNAME,
         'timestamp': datetime.now().isoformat()
     })
 
-@app.route('/static/<path:filename>')
-def static_files(filename):
-    """Serve static files"""
-    import os
-    from flask import Response
-    # Get the directory where this script is located
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    static_dir = os.path.join(script_dir, 'static')
-    
-    # Get the response first
-    response = send_from_directory(static_dir, filename)
-    
-    # Set correct MIME type for JavaScript files
-    if filename.endswith('.js'):
-        response.headers['Content-Type'] = 'application/javascript'
-    
-    return response
+
+def shared_cluster_status():
+    """build_cluster_status(), reusing a fresh or in-progress build."""
+    global _cluster_status_in_flight, _cluster_status_last
+    with _cluster_status_lock:
+        last = _cluster_status_last
+        if last is not None and time.monotonic() - last[1] < CLUSTER_STATUS_MAX_AGE:
+            return last[0]
+        future = _cluster_status_in_flight
+        running = future is None
+        if running:
+            future = _cluster_status_in_flight = Future()
+    if running:
+        try:
+            body = build_cluster_status()
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(body)
+            with _cluster_status_lock:
+                _cluster_status_last = (body, time.monotonic())
+        finally:
+            with _cluster_status_lock:
+                _cluster_status_in_flight = None
+    return future.result()
+
+
+@app.route('/api/cluster-status')
+def cluster_status_api():
+    """API endpoint returning cluster status as JSON"""
+    return Response(shared_cluster_status(), mimetype='application/json')
 
 @app.route('/status')
 def status_page():
@@ -3084,6 +3954,9 @@ if __name__ == '__main__':
     # only ones that talk to etcd. Non-storage admin-api instances must start
     # (and serve local /metrics) without etcd, since etcd is firewalled to s*.
     if is_etcd_node():
+        # Retry quickly at first (etcd is usually just a moment behind us
+        # at boot), backing off to every 5s during a real outage.
+        delay = 0.1
         while True:
             try:
                 client = get_etcd_client()
@@ -3091,11 +3964,17 @@ if __name__ == '__main__':
                 break
             except Exception as e:
                 print(f"Waiting for etcd: {e}")
-                time.sleep(5)
+                time.sleep(delay)
+                delay = min(delay * 2, 5)
+        start_allocation_watcher()
+        start_mirror_watchers()
     else:
         print("Non-storage node: skipping etcd wait (etcd access is core-only)")
 
-    # waitress: production WSGI server, single process with a thread pool —
-    # same concurrency model the in-process allocation_lock assumes.
+    # waitress: production WSGI server, single process with a thread pool.
+    # Requests spend nearly all their time blocked on etcd, subprocesses and
+    # HTTP probes, so the pool is sized well past the core count. (gevent
+    # workers would need the grpc gevent shim for etcd3; threads don't.)
+    threads = int(os.environ.get('ADMIN_API_THREADS', '16'))
     from waitress import serve
-    serve(app, host='0.0.0.0', port=12723, threads=8)
+    serve(app, host='0.0.0.0', port=12723, threads=threads)
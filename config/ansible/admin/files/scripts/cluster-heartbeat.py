@@ -9,7 +9,10 @@ import re
 import sys
 import json
 import socket
+import orjson
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from datetime import datetime
 
 from ycluster.common.etcd_utils import get_etcd_client
@@ -17,6 +20,19 @@ from ycluster.common.etcd_utils import get_etcd_client
 # etcd key for healthchecks URL
 HEALTHCHECKS_ETCD_KEY = '/cluster/healthchecks/url'
 
+LOCAL_HOSTNAME = socket.gethostname()
+
+# Service statuses reported as failures; degraded ones are listed per node
+# but don't make the service "Unhealthy" cluster-wide
+ERROR_STATUSES = frozenset({'unhealthy', 'error'})
+FAILED_STATUSES = ERROR_STATUSES | {'degraded'}
+
+# One session for the run: the two admin API reads share a localhost
+# connection and a /fail retry reuses the healthchecks.io TLS connection
+HTTP_SESSION = requests.Session()
+HTTP_SESSION.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=4))
+HTTP_SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
 def get_healthchecks_url():
     """Get healthchecks URL from etcd"""
     try:
@@ -34,17 +50,24 @@ def get_cluster_health():
     """Get comprehensive cluster health status"""
     health_data = {
         'timestamp': datetime.now().isoformat(),
-        'hostname': socket.gethostname(),
+        'hostname': LOCAL_HOSTNAME,
         'services': {},
         'nodes': {},
         'overall': 'healthy'
     }
     
+    # The local and cluster-wide reads are independent; run them side by side
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        health_future = pool.submit(
+            HTTP_SESSION.get, 'http://localhost:12723/api/health', timeout=10)
+        status_future = pool.submit(
+            HTTP_SESSION.get, 'http://localhost:12723/api/cluster-status', timeout=30)
+    
     try:
         # Check local health API
-        response = requests.get('http://localhost:12723/api/health', timeout=10)
+        response = health_future.result()
         if response.status_code in [200, 503]:
-            local_health = response.json()
+            local_health = orjson.loads(response.content)
             health_data['services'] = local_health.get('services', {})
             health_data['overall'] = local_health.get('overall', 'unknown')
             health_data['storage_leader'] = local_health.get('storage_leader', False)
@@ -55,16 +78,17 @@ def get_cluster_health():
     
     # Get cluster-wide status
     try:
-        response = requests.get('http://localhost:12723/api/cluster-status', timeout=30)
+        response = status_future.result()
         if response.status_code == 200:
-            cluster_status = response.json()
+            cluster_status = orjson.loads(response.content)
             
-            # Count healthy vs unhealthy nodes
+            # Count healthy vs unhealthy nodes, noting the failed services
+            # of the bad ones in the same pass
             healthy_nodes = 0
             unhealthy_nodes = 0
             unreachable_nodes = 0
-            unhealthy_node_names = []
-            unreachable_node_names = []
+            unhealthy_services = {}
+            unreachable_services = {}
             
             for hostname, node_health in cluster_status.get('hostHealth', {}).items():
                 node_status = node_health.get('overall') or node_health.get('status', '')
@@ -72,55 +96,49 @@ def get_cluster_health():
                     continue
                 if node_status == 'healthy':
                     healthy_nodes += 1
-                elif node_status in ['timeout', 'unreachable']:
+                    continue
+                services = node_health.get('services', {})
+                bad = {
+                    svc: d.get('status') for svc, d in services.items()
+                    if isinstance(d, dict)
+                    and d.get('status') in FAILED_STATUSES
+                }
+                if node_status in ['timeout', 'unreachable']:
                     unreachable_nodes += 1
-                    unreachable_node_names.append(hostname)
+                    unreachable_services[hostname] = bad
                 else:
                     # Ignore non-core nodes whose only non-healthy service is
                     # clock_skew — remote NTP checks flap and aren't worth
                     # alerting on. Storage nodes (s*) need tight time sync for
                     # Ceph, so clock skew there still counts as unhealthy.
                     is_core = re.match(r'^s\d+$', hostname) is not None
-                    services = node_health.get('services', {})
-                    bad = [
-                        svc for svc, d in services.items()
-                        if isinstance(d, dict)
-                        and d.get('status') in ('unhealthy', 'error', 'degraded')
-                    ]
                     if not is_core and bad and all(svc == 'clock_skew' for svc in bad):
                         healthy_nodes += 1
                         continue
                     unhealthy_nodes += 1
-                    unhealthy_node_names.append(hostname)
+                    unhealthy_services[hostname] = bad
             
             health_data['nodes'] = {
                 'healthy': healthy_nodes,
                 'unhealthy': unhealthy_nodes,
                 'unreachable': unreachable_nodes,
                 'total': healthy_nodes + unhealthy_nodes + unreachable_nodes,
-                'unhealthy_names': unhealthy_node_names,
-                'unreachable_names': unreachable_node_names
+                'unhealthy_names': list(unhealthy_services),
+                'unreachable_names': list(unreachable_services)
             }
             
-            # Collect service details from unhealthy nodes
-            unhealthy_services_by_node = {}
-            for hostname in unhealthy_node_names + unreachable_node_names:
-                node_health = cluster_status.get('hostHealth', {}).get(hostname, {})
-                services = node_health.get('services', {})
-                failed = []
-                for svc, details in services.items():
-                    if isinstance(details, dict):
-                        status = details.get('status', '')
-                        if status in ['unhealthy', 'error', 'degraded']:
-                            failed.append(f"{svc}({status})")
-                if failed:
-                    unhealthy_services_by_node[hostname] = failed
+            # Service details from unhealthy nodes
+            unhealthy_services_by_node = {
+                hostname: [f"{svc}({status})" for svc, status in bad.items()]
+                for hostname, bad in {**unhealthy_services, **unreachable_services}.items()
+                if bad
+            }
             
             if unhealthy_services_by_node:
                 health_data['unhealthy_services_by_node'] = unhealthy_services_by_node
             
             # Local services
-            local_health = cluster_status.get('hostHealth', {}).get(socket.gethostname(), {})
+            local_health = cluster_status.get('hostHealth', {}).get(LOCAL_HOSTNAME, {})
             health_data['local_services'] = local_health.get('services', {})
             
             # Add leadership info
@@ -144,31 +162,28 @@ def get_cluster_health():
 
 def determine_health_status(health_data):
     """Determine overall health status and exit code"""
+    overall = health_data.get('overall')
+    nodes = health_data.get('nodes', {})
+    unreachable = nodes.get('unreachable', 0)
+    cert_status = health_data.get('certificate', {}).get('status')
+    services = health_data.get('services', {})
+    
     # Critical failures (exit code 2)
-    critical_conditions = [
-        health_data.get('overall') == 'unhealthy',
-        health_data.get('nodes', {}).get('unreachable', 0) > 1,
-        health_data.get('certificate', {}).get('status') in ['expired', 'critical'],
-        'etcd' in health_data.get('services', {}) and 
-            health_data['services']['etcd'].get('status') == 'unhealthy',
-        'ceph' in health_data.get('services', {}) and 
-            health_data['services']['ceph'].get('status') == 'unhealthy'
-    ]
+    if (overall == 'unhealthy'
+            or unreachable > 1
+            or cert_status in ('expired', 'critical')
+            or services.get('etcd', {}).get('status') == 'unhealthy'
+            or services.get('ceph', {}).get('status') == 'unhealthy'):
+        return 2, 'critical'
     
     # Warning conditions (exit code 1)
-    warning_conditions = [
-        health_data.get('overall') == 'degraded',
-        health_data.get('nodes', {}).get('unhealthy', 0) > 0,
-        health_data.get('nodes', {}).get('unreachable', 0) == 1,
-        health_data.get('certificate', {}).get('status') == 'warning'
-    ]
-    
-    if any(critical_conditions):
-        return 2, 'critical'
-    elif any(warning_conditions):
+    if (overall == 'degraded'
+            or nodes.get('unhealthy', 0) > 0
+            or unreachable == 1
+            or cert_status == 'warning'):
         return 1, 'warning'
-    else:
-        return 0, 'healthy'
+    
+    return 0, 'healthy'
 
 def format_health_message(health_data, status):
     """Format health data into a human-readable message"""
@@ -212,10 +227,10 @@ def format_health_message(health_data, status):
     
     # Critical service issues
     services = health_data.get('services', {})
-    unhealthy_services = []
-    for service, details in services.items():
-        if isinstance(details, dict) and details.get('status') in ['unhealthy', 'error']:
-            unhealthy_services.append(service)
+    unhealthy_services = [
+        service for service, details in services.items()
+        if isinstance(details, dict) and details.get('status') in ERROR_STATUSES
+    ]
     
     if unhealthy_services:
         lines.append(f"Unhealthy Services: {', '.join(unhealthy_services)}")
@@ -223,14 +238,11 @@ def format_health_message(health_data, status):
     # Local service details
     local_services = health_data.get('local_services', {})
     if local_services:
-        failed_services = []
-        for service, details in local_services.items():
-            if isinstance(details, dict):
-                svc_status = details.get('status', '')
-                if svc_status in ['unhealthy', 'error']:
-                    failed_services.append(f"{service}({svc_status})")
-                elif svc_status == 'degraded':
-                    failed_services.append(f"{service}(degraded)")
+        failed_services = [
+            f"{service}({details['status']})"
+            for service, details in local_services.items()
+            if isinstance(details, dict) and details.get('status') in FAILED_STATUSES
+        ]
         if failed_services:
             lines.append(f"  Failed: {', '.join(failed_services)}")
     
@@ -266,13 +278,13 @@ def send_heartbeat():
         # with the WARNING body still visible in the ping log. /fail is
         # reserved for true critical conditions.
         if exit_code in (0, 1):
-            response = requests.post(healthchecks_url,
-                                    data=message,
-                                    timeout=10)
+            response = HTTP_SESSION.post(healthchecks_url,
+                                         data=message,
+                                         timeout=10)
         else:
-            response = requests.post(f"{healthchecks_url}/fail",
-                                    data=message,
-                                    timeout=10)
+            response = HTTP_SESSION.post(f"{healthchecks_url}/fail",
+                                         data=message,
+                                         timeout=10)
         
         if response.status_code == 200:
             print(f"Heartbeat sent successfully (status: {status})")
@@ -285,17 +297,20 @@ def send_heartbeat():
         print(f"Failed to send heartbeat: {str(e)}")
         # Try to send failure notification
         try:
-            requests.post(f"{healthchecks_url}/fail", 
-                        data=f"Heartbeat script error: {str(e)}",
-                        timeout=10)
-        except:
-            pass
+            HTTP_SESSION.post(f"{healthchecks_url}/fail", 
+                              data=f"Heartbeat script error: {str(e)}",
+                              timeout=10)
+        except requests.RequestException as fail_error:
+            print(f"Failed to send failure notification: {fail_error}")
         return False
 
 def main():
     """Main function - single heartbeat execution"""
     # Send single heartbeat
-    success = send_heartbeat()
+    try:
+        success = send_heartbeat()
+    finally:
+        HTTP_SESSION.close()
     sys.exit(0 if success else 1)
 
 if __name__ == '__main__':
@@ -25,8 +25,8 @@ class FakeEtcd:
         v = self.store.get(key)
         return (v.encode() if v is not None else None, _Meta(key))
 
-    def get_prefix(self, prefix):
-        return [(v.encode(), _Meta(k))
+    def get_prefix(self, prefix, keys_only=False):
+        return [(b"" if keys_only else v.encode(), _Meta(k))
                 for k, v in sorted(self.store.items())
                 if k.startswith(prefix)]
 
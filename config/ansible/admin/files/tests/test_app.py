@@ -12,6 +12,7 @@ Run from config/ansible/admin/files:
 
 import os
 import sys
+import tempfile
 import unittest
 from datetime import datetime, timedelta, timezone
 
@@ -217,5 +218,168 @@ class ScheduleDataTests(SchedTestBase):
         self.assertEqual(self.get("/admin/vm-schedule/data").status_code, 503)
 
 
+class HostnameAllocationTests(unittest.TestCase):
+    def seed(self, *hostnames):
+        etcd = FakeEtcd()
+        for h in hostnames:
+            etcd.seed_json(f"{appmod.ETCD_PREFIX}/by-hostname/{h}", {"hostname": h})
+        return etcd
+
+    def test_next_free_bit(self):
+        self.assertEqual(appmod._next_free_bit(0), 0)
+        self.assertEqual(appmod._next_free_bit(0b0111), 3)
+        self.assertEqual(appmod._next_free_bit(0b1011), 2)
+
+    def test_fills_first_gap(self):
+        etcd = self.seed("c1", "c2", "c4", "s1")
+        self.assertEqual(appmod._pick_hostname(etcd, "compute"), "c3")
+        self.assertEqual(appmod._pick_hostname(etcd, "storage"), "s2")
+
+    def test_shared_masks_give_distinct_names(self):
+        etcd = self.seed("c1", "c3")
+        masks = {}
+        picks = [appmod._pick_hostname(etcd, "compute", masks) for _ in range(3)]
+        self.assertEqual(picks, ["c2", "c4", "c5"])
+
+    def test_ignores_non_numbered_names_under_prefix(self):
+        etcd = self.seed("d1", "dhcp-200")
+        self.assertEqual(appmod._pick_hostname(etcd, "dev"), "d2")
+
+    def test_exhausted_range_raises(self):
+        max_s = appmod.IP_RANGES["s"]["max"]
+        etcd = self.seed(*[f"s{i}" for i in range(1, max_s + 1)])
+        with self.assertRaises(ValueError):
+            appmod._pick_hostname(etcd, "storage")
+
+
+class AllocationCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.etcd = FakeEtcd()
+        self._orig = appmod.get_etcd_client
+        appmod.get_etcd_client = lambda: self.etcd
+
+    def tearDown(self):
+        appmod.get_etcd_client = self._orig
+        with appmod._cache_lock:
+            appmod._allocation_cache.clear()
+            appmod._allocation_cache_ready = False
+            appmod._allocation_views.clear()
+
+    def test_falls_back_to_etcd_until_ready(self):
+        self.etcd.seed_json(f"{appmod.ETCD_PREFIX}/by-hostname/c1", {"hostname": "c1"})
+        self.etcd.put(f"{appmod.ETCD_PREFIX}/by-hostname/c2", "not json")
+        self.assertEqual(appmod.get_allocation_records(), [{"hostname": "c1"}])
+
+    def test_records_carry_colon_mac(self):
+        self.etcd.seed_json(f"{appmod.ETCD_PREFIX}/by-hostname/c1",
+                            {"hostname": "c1", "mac": "aabbccddeeff"})
+        [record] = appmod.get_allocation_records()
+        self.assertEqual(record["mac_colon"], "aa:bb:cc:dd:ee:ff")
+
+    def test_serves_from_cache_when_ready(self):
+        with appmod._cache_lock:
+            appmod._allocation_cache["s1"] = {"hostname": "s1"}
+            appmod._allocation_cache_ready = True
+        self.assertEqual(appmod.get_allocation_records(), [{"hostname": "s1"}])
+
+    def test_all_hosts_filters_and_sorts_numerically(self):
+        for name, typ in [("s10", "storage"), ("s2", "storage"), ("s2a", "amt"),
+                          ("c1", "compute"), ("dhcp-101", "compute")]:
+            self.etcd.seed_json(f"{appmod.ETCD_PREFIX}/by-hostname/{name}",
+                                {"hostname": name, "ip": "10.0.0.1", "type": typ})
+        self.assertEqual([h["hostname"] for h in appmod.get_all_hosts()],
+                         ["c1", "s2", "s10"])
+
+    def test_view_rebuilt_only_on_generation_change(self):
+        calls = []
+        def build(records):
+            calls.append(1)
+            return len(records)
+        with appmod._cache_lock:
+            appmod._allocation_cache["s1"] = {"hostname": "s1"}
+            appmod._allocation_cache_ready = True
+        self.assertEqual(appmod.allocation_view("n", build), 1)
+        self.assertEqual(appmod.allocation_view("n", build), 1)
+        self.assertEqual(len(calls), 1)
+        with appmod._cache_lock:
+            appmod._allocation_cache["s2"] = {"hostname": "s2"}
+            appmod._allocation_cache_generation += 1
+        self.assertEqual(appmod.allocation_view("n", build), 2)
+        self.assertEqual(len(calls), 2)
+
+    def test_existing_allocation_served_from_cache(self):
+        record = {"hostname": "c1", "mac": "aabbccddeeff", "type": "compute",
+                  "ip": "10.0.0.51", "amt_ip": "10.10.10.51"}
+        with appmod._cache_lock:
+            appmod._allocation_cache["c1"] = record
+            appmod._allocation_cache_ready = True
+        # Nothing in etcd: the answer can only have come from the cache
+        allocation = appmod.get_or_create_allocation("aa:bb:cc:dd:ee:ff")
+        self.assertEqual(allocation["hostname"], "c1")
+        self.assertIsNot(allocation, record)
+
+
+class MacFromIpTests(unittest.TestCase):
+    def setUp(self):
+        self.etcd = FakeEtcd()
+        self._orig = appmod.get_etcd_client
+        appmod.get_etcd_client = lambda: self.etcd
+
+    def tearDown(self):
+        appmod.get_etcd_client = self._orig
+
+    def test_uses_ip_index(self):
+        self.etcd.put("/cluster/dhcp/by-ip/10.0.0.21", "aa:bb:cc:dd:ee:01")
+        self.etcd.seed_json("/cluster/dhcp/leases/aabbccddee01",
+                            {"ip": "10.0.0.21", "mac": "aa:bb:cc:dd:ee:01"})
+        self.assertEqual(appmod.get_mac_from_ip("10.0.0.21"), "aa:bb:cc:dd:ee:01")
+
+    def test_stale_index_falls_back_to_lease_scan(self):
+        # The indexed MAC has since moved to another IP
+        self.etcd.put("/cluster/dhcp/by-ip/10.0.0.21", "aa:bb:cc:dd:ee:01")
+        self.etcd.seed_json("/cluster/dhcp/leases/aabbccddee01",
+                            {"ip": "10.0.0.22", "mac": "aa:bb:cc:dd:ee:01"})
+        self.etcd.seed_json("/cluster/dhcp/leases/aabbccddee02",
+                            {"ip": "10.0.0.21", "mac": "aa:bb:cc:dd:ee:02"})
+        self.assertEqual(appmod.get_mac_from_ip("10.0.0.21"), "aa:bb:cc:dd:ee:02")
+
+
+class MirrorTests(unittest.TestCase):
+    def tearDown(self):
+        with appmod._mirror_lock:
+            appmod._mirrors.clear()
+
+    def test_lookup_only_under_live_prefix(self):
+        self.assertIsNone(appmod.etcd_mirrored("/cluster/leader/app"))
+        with appmod._mirror_lock:
+            appmod._mirrors["/cluster/leader/"] = {"/cluster/leader/app": (b"s1", 7)}
+        self.assertEqual(appmod.etcd_mirrored("/cluster/leader/app"), (b"s1", 7))
+        self.assertEqual(appmod.etcd_mirrored("/cluster/leader/dhcp"), (None, None))
+        self.assertIsNone(appmod.etcd_mirrored("/cluster/tls/cert"))
+
+
+class CachedFileTests(unittest.TestCase):
+    def test_rereads_only_after_mtime_change(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".pub", delete=False) as f:
+            f.write("ssh-ed25519 AAAA one\n")
+        self.addCleanup(os.unlink, f.name)
+        parses = []
+        def parse(text):
+            parses.append(text)
+            return text.strip()
+        self.assertEqual(appmod._cached_file(f.name, parse), "ssh-ed25519 AAAA one")
+        self.assertEqual(appmod._cached_file(f.name, parse), "ssh-ed25519 AAAA one")
+        self.assertEqual(len(parses), 1)
+        with open(f.name, "w") as out:
+            out.write("ssh-ed25519 AAAA two\n")
+        os.utime(f.name, ns=(0, os.stat(f.name).st_mtime_ns + 1))
+        self.assertEqual(appmod._cached_file(f.name, parse), "ssh-ed25519 AAAA two")
+
+    def test_shadow_password(self):
+        shadow = "root:*:19000:0:99999:7:::\nubuntu:$6$salt$hash:19000:0:99999:7:::\n"
+        self.assertEqual(appmod._shadow_password(shadow), "$6$salt$hash")
+        self.assertIsNone(appmod._shadow_password("root:*:19000::::::\n"))
+
+
 if __name__ == "__main__":
     unittest.main()
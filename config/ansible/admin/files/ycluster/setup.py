@@ -32,6 +32,7 @@ setup(
         "protobuf>=3.20.0",  # apt's 3.21.12 (internally reports as 4.21.12) works fine with etcd3
         "flask>=2.0.0",
         "requests>=2.25.0",
+        "orjson>=3.6.0",
         "dnspython>=2.1.0",
         "cryptography>=3.4.0",
         "jinja2>=3.0.0",
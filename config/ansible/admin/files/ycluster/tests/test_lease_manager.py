@@ -0,0 +1,73 @@
+"""Unit tests for the delete paths of ycluster.utils.lease_manager.
+
+The etcd client is a mock that records the transaction it is given, so
+these check which keys a delete removes without touching etcd.
+
+Run from the package root (config/ansible/admin/files/ycluster):
+    python3 -m unittest tests.test_lease_manager
+"""
+
+import contextlib
+import io
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from ycluster.utils import lease_manager as lm
+
+
+def fake_client(values):
+    """Mock etcd client serving values ({key: bytes}); deletes hit every key."""
+    client = mock.MagicMock()
+    client.get.side_effect = lambda key: (values.get(key), None)
+    client.transactions.delete.side_effect = lambda key: ('delete', key)
+
+    def transaction(compare, success, failure):
+        responses = [SimpleNamespace(response_delete_range=SimpleNamespace(deleted=1))
+                     for _ in success]
+        return True, responses
+    client.transaction.side_effect = transaction
+    return client
+
+
+class DeleteByHostnameTests(unittest.TestCase):
+    ALLOCATION = b'{"mac": "aa:bb:cc:dd:ee:ff", "ip": "10.0.0.51"}'
+
+    def delete(self, lease_value):
+        client = fake_client({
+            '/cluster/nodes/by-hostname/c1': self.ALLOCATION,
+            '/cluster/dhcp/leases/aabbccddeeff': lease_value,
+        })
+        with mock.patch.object(lm, 'get_etcd_client', return_value=client), \
+                contextlib.redirect_stdout(io.StringIO()):
+            result = lm.delete_by_hostname('c1')
+        return result, client
+
+    def test_deletes_allocation_lease_and_ip_index(self):
+        result, client = self.delete(b'{"mac": "aa:bb:cc:dd:ee:ff", "ip": "10.0.0.51"}')
+        self.assertTrue(result)
+        kwargs = client.transaction.call_args.kwargs
+        self.assertEqual(len(kwargs['compare']), 1)
+        self.assertEqual(kwargs['success'], [
+            ('delete', '/cluster/nodes/by-hostname/c1'),
+            ('delete', '/cluster/nodes/by-mac/aabbccddeeff'),
+            ('delete', '/cluster/dhcp/leases/aabbccddeeff'),
+            ('delete', '/cluster/dhcp/by-ip/10.0.0.51'),
+        ])
+
+    def test_corrupt_lease_is_still_deleted(self):
+        for lease_value in (b'{corrupt', b'["not", "a", "dict"]'):
+            with self.subTest(lease_value=lease_value):
+                result, client = self.delete(lease_value)
+                self.assertTrue(result)
+                kwargs = client.transaction.call_args.kwargs
+                self.assertEqual(kwargs['compare'], [])
+                self.assertEqual(kwargs['success'], [
+                    ('delete', '/cluster/nodes/by-hostname/c1'),
+                    ('delete', '/cluster/nodes/by-mac/aabbccddeeff'),
+                    ('delete', '/cluster/dhcp/leases/aabbccddeeff'),
+                ])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,7 +6,7 @@ import sys
 from pathlib import Path
 import subprocess
 from ..utils import certbot_manager
-from ..common.etcd_utils import get_etcd_client
+from ..common.etcd_utils import get_etcd_client, get_many
 
 
 def register_certbot_commands(subparsers):
@@ -110,8 +110,7 @@ def certbot_status(args):
     # Check if TLS materials exist
     try:
         client = get_etcd_client()
-        key_value, _ = client.get('/cluster/tls/key')
-        cert_value, _ = client.get('/cluster/tls/cert')
+        key_value, cert_value = get_many(client, ['/cluster/tls/key', '/cluster/tls/cert'])
         
         if key_value and cert_value:
             print("TLS materials: Present in etcd")
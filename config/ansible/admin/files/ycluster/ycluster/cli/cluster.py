@@ -101,8 +101,9 @@ def _set_drain_state(hostname, drain):
     import sys
     from ..utils.host_state import set_drain
     try:
-        set_drain(hostname, drain)
-        print(f"{hostname}: {'drained' if drain else 'active'}")
+        changed = set_drain(hostname, drain)
+        print(f"{hostname}: {'drained' if drain else 'active'}"
+              f"{'' if changed else ' (unchanged)'}")
     except KeyError:
         print(f"Error: Host '{hostname}' not found", file=sys.stderr)
         sys.exit(1)
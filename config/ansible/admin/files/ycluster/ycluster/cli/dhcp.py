@@ -55,8 +55,7 @@ def dhcp_delete(args):
     """Delete DHCP entries"""
     target = args.target
     # Auto-detect if target is hostname or MAC address
-    if ':' in target or len(target.replace(':', '').replace('-', '')) == 12:
-        # Looks like a MAC address
+    if lease_manager.is_mac_address(target):
         success = lease_manager.delete_by_mac(target)
     else:
         # Assume it's a hostname
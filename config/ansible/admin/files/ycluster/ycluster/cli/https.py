@@ -75,7 +75,7 @@ def https_get(args):
         if 'email' in config:
             print(f"Email: {config['email']}")
         
-        all_domains = https_config.get_all_domains()
+        all_domains = https_config.get_all_domains(config)
         if all_domains:
             print(f"All domains: {', '.join(all_domains)}")
     else:
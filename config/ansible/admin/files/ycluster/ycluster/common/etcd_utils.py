@@ -1,6 +1,11 @@
+import atexit
+import itertools
 import os
+import threading
 import time
+import urllib.parse
 import etcd3
+import etcd3.utils
 
 
 def get_etcd_hosts():
@@ -20,6 +25,38 @@ def get_etcd_hosts():
     return ['localhost:2379']
 
 
+def parse_etcd_endpoints(hosts):
+    """Split 'host:port' strings into (host, int(port)) tuples.
+
+    Raises ValueError for an entry that isn't host:port.
+    """
+    endpoints = []
+    for host_port in hosts:
+        host, sep, port = host_port.rpartition(':')
+        if not sep or not host or not port.isdigit():
+            raise ValueError(f"etcd endpoint {host_port!r} is not host:port")
+        endpoints.append((host, int(port)))
+    return endpoints
+
+
+# Endpoints from the environment, parsed once at import so a malformed
+# ETCD_HOSTS fails at startup rather than on the first reconnect.
+ETCD_ENDPOINTS = parse_etcd_endpoints(get_etcd_hosts())
+
+# Keepalive pings let a channel notice a dead member's half-open TCP
+# connection in seconds (etcd accepts pings every 5s by default).
+DEFAULT_GRPC_OPTIONS = [
+    ('grpc.enable_http_proxy', 0),
+    ('grpc.keepalive_time_ms', 10000),
+    ('grpc.keepalive_timeout_ms', 3000),
+    ('grpc.keepalive_permit_without_calls', 1),
+]
+
+# How long connect_with_retry's status() probe waits on a host before
+# moving on to the next one.
+CONNECT_TIMEOUT = 1
+
+
 def get_tls_kwargs():
     """Return etcd3.client TLS kwargs from the environment, or {} for plaintext.
 
@@ -42,32 +79,114 @@ def get_tls_kwargs():
     return kwargs
 
 
+def leader_endpoint(status, endpoints):
+    """The (host, port) in endpoints that status names as the Raft leader.
+
+    None if there is no leader or it isn't reachable under a configured
+    name (the TLS setup only vouches for those).
+    """
+    if status.leader is None:
+        return None
+    for url in status.leader.client_urls:
+        parsed = urllib.parse.urlsplit(url)
+        if (parsed.hostname, parsed.port) in endpoints:
+            return (parsed.hostname, parsed.port)
+    return None
+
+
 def connect_with_retry(hosts, max_retries=3, retry_delay=1, grpc_options=None):
-    """Attempt to connect to etcd using host list with retries."""
-    grpc_options = grpc_options or [('grpc.enable_http_proxy', 0)]
+    """Attempt to connect to etcd using host list with retries.
+
+    Returns a client for the Raft leader when it is one of the configured
+    hosts, so writes and linearizable reads aren't forwarded by a follower;
+    otherwise the first host that answers. Each host gets CONNECT_TIMEOUT
+    seconds to answer the probe; RPCs on the returned client are unbounded.
+    """
+    endpoints = parse_etcd_endpoints(hosts)
+    grpc_options = grpc_options or DEFAULT_GRPC_OPTIONS
     tls_kwargs = get_tls_kwargs()
     last_errors = []
+    # One client per endpoint, reused across attempts: a retry re-probes
+    # the existing channel instead of opening another. Whatever isn't
+    # returned is closed on the way out.
+    clients = {}
 
-    for attempt in range(max_retries):
-        attempt_errors = []
-        for host_port in hosts:
-            try:
-                host, port = host_port.split(':')
-                client = etcd3.client(host=host, port=int(port), grpc_options=grpc_options, **tls_kwargs)
-                client.status()
-                return client
-            except Exception as e:
-                attempt_errors.append(f"{host_port}: {str(e)}")
-                continue
-        
-        last_errors = attempt_errors
-        if attempt < max_retries - 1:
-            time.sleep(retry_delay)
+    try:
+        for attempt in range(max_retries):
+            attempt_errors = []
+            for endpoint in endpoints:
+                host, port = endpoint
+                try:
+                    client = clients.get(endpoint)
+                    if client is None:
+                        client = clients[endpoint] = etcd3.client(
+                            host=host, port=port, timeout=CONNECT_TIMEOUT,
+                            grpc_options=grpc_options, **tls_kwargs)
+                    status = client.status()
+                except Exception as e:
+                    attempt_errors.append(f"{host}:{port}: {str(e)}")
+                    continue
+                leader = leader_endpoint(status, endpoints)
+                if leader is None or leader == endpoint:
+                    del clients[endpoint]
+                    client.timeout = None
+                    return client
+                # The follower just heard from the leader, so skip another
+                # status() probe; channels connect lazily on the first call.
+                try:
+                    return etcd3.client(host=leader[0], port=leader[1],
+                                        grpc_options=grpc_options, **tls_kwargs)
+                except Exception as e:
+                    print(f"etcd leader {leader[0]}:{leader[1]} unusable, staying on "
+                          f"{host}:{port}: {e}")
+                    del clients[endpoint]
+                    client.timeout = None
+                    return client
+
+            last_errors = attempt_errors
+            if attempt < max_retries - 1:
+                time.sleep(retry_delay)
+    finally:
+        for client in clients.values():
+            client.close()
     
     error_details = "; ".join(last_errors)
     raise ConnectionError(f"Could not connect to any etcd host after {max_retries} attempts. Errors: {error_details}")
 
 
+def get_many(client, keys):
+    """Read several keys in one round-trip; values (or None) in key order.
+
+    The reads go out as a single read-only transaction, so they also see
+    one consistent revision.
+    """
+    _, responses = client.transaction(
+        compare=[],
+        success=[client.transactions.get(key) for key in keys],
+        failure=[]
+    )
+    return [kvs[0][0] if kvs else None for kvs in responses]
+
+
+def iter_prefix(client, prefix, page=1024):
+    """Yield (value, metadata) under prefix in key order, page keys per RPC.
+
+    Unlike get_prefix, no single response holds the whole prefix, so a
+    large one neither hits the gRPC message limit nor sits in memory.
+    """
+    range_end = etcd3.utils.prefix_range_end(etcd3.utils.to_bytes(prefix))
+    start = prefix
+    while True:
+        count = 0
+        for value, metadata in client.get_range(start, range_end, sort_order='ascend',
+                                                sort_target='key', limit=page):
+            count += 1
+            yield value, metadata
+        if count < page:
+            return
+        start = metadata.key + b'\x00'
+
+
 _CACHED_CLIENT = None
 
 
@@ -95,3 +214,103 @@ def get_etcd_client(hosts=None, max_retries=3, retry_delay=1, grpc_options=None)
     except ConnectionError as e:
         print(f"Failed to establish etcd connection: {e}")
         raise
+
+
+def _close_cached_client():
+    """Close the cached client's channel at exit, if it is still cached."""
+    global _CACHED_CLIENT
+    client, _CACHED_CLIENT = _CACHED_CLIENT, None
+    if client is not None:
+        client.close()
+
+
+atexit.register(_close_cached_client)
+
+
+class EtcdPool:
+    """Round-robin pool of etcd clients, one per endpoint.
+
+    For long-running multi-threaded services (the admin API): successive
+    get() calls rotate across the configured endpoints, spreading load over
+    the etcd members instead of funnelling every thread through one
+    channel. Clients are created and probed with status() lazily, the
+    first time their endpoint comes up in the rotation; unreachable
+    endpoints are skipped, so get() only raises ConnectionError when every
+    endpoint is down. Callers that hit an error on a client should
+    discard() it so its endpoint reconnects on its next turn.
+
+    Every RPC on a pooled client is bounded by `timeout` seconds, so a
+    dead member costs a request seconds rather than the gRPC default. An
+    endpoint that failed within the last FAILURE_COOLDOWN seconds is passed
+    over while any other endpoint is usable.
+    """
+
+    FAILURE_COOLDOWN = 10
+
+    def __init__(self, hosts=None, grpc_options=None, timeout=2):
+        self._endpoints = parse_etcd_endpoints(hosts) if hosts else ETCD_ENDPOINTS
+        self._grpc_options = grpc_options or DEFAULT_GRPC_OPTIONS
+        self._tls_kwargs = get_tls_kwargs()
+        self._timeout = timeout
+        self._clients = [None] * len(self._endpoints)
+        self._failed_at = [None] * len(self._endpoints)
+        self._rotation = itertools.cycle(range(len(self._endpoints)))
+        self._lock = threading.Lock()
+
+    def _cooling_down(self, index):
+        failed_at = self._failed_at[index]
+        return failed_at is not None and time.monotonic() - failed_at < self.FAILURE_COOLDOWN
+
+    def _connect(self, index, errors):
+        """Connect endpoint index into the pool; None (and a note in errors) on failure."""
+        host, port = self._endpoints[index]
+        try:
+            client = etcd3.client(host=host, port=port, timeout=self._timeout,
+                                  grpc_options=self._grpc_options, **self._tls_kwargs)
+            client.status()
+        except Exception as e:
+            with self._lock:
+                self._failed_at[index] = time.monotonic()
+            errors.append(f"{host}:{port}: {e}")
+            return None
+        with self._lock:
+            # Another thread may have connected this endpoint meanwhile;
+            # keep theirs so callers share one channel per endpoint.
+            pooled = self._clients[index]
+            if pooled is None:
+                pooled = self._clients[index] = client
+            self._failed_at[index] = None
+        if pooled is not client:
+            client.close()
+        return pooled
+
+    def get(self):
+        """Return the next endpoint's client, connecting it if needed."""
+        errors = []
+        cooling = []
+        for _ in range(len(self._endpoints)):
+            with self._lock:
+                index = next(self._rotation)
+                client = self._clients[index]
+                if client is None and self._cooling_down(index):
+                    cooling.append(index)
+                    continue
+            if client is None:
+                client = self._connect(index, errors)
+            if client is not None:
+                return client
+        # Everything else is down too: give recently failed endpoints a
+        # chance rather than failing outright.
+        for index in cooling:
+            client = self._connect(index, errors)
+            if client is not None:
+                return client
+        raise ConnectionError(f"Could not connect to any etcd host. Errors: {'; '.join(errors)}")
+
+    def discard(self, client):
+        """Drop a failed client; its endpoint is retried after the cooldown."""
+        with self._lock:
+            for index, pooled in enumerate(self._clients):
+                if pooled is client:
+                    self._clients[index] = None
+                    self._failed_at[index] = time.monotonic()
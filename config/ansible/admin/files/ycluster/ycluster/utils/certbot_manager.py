@@ -10,7 +10,8 @@ import tempfile
 from jinja2 import Template
 from pathlib import Path
 
-from ..common.etcd_utils import get_etcd_client
+from ..common.etcd_utils import get_etcd_client, get_many
+from .fetch_tls_certs import NGINX_CERT_PATH, NGINX_KEY_PATH, write_atomic
 
 def write_tls_key_to_temp():
     """Write TLS private key from etcd to temporary file for CSR generation"""
@@ -47,19 +48,23 @@ def write_tls_key_to_nginx():
         return None
     
     # Nginx SSL paths (matching the template)
-    ssl_dir = Path('/etc/nginx/ssl')
-    ssl_dir.mkdir(parents=True, exist_ok=True)
-    
-    key_path = ssl_dir / 'key.pem'
+    key_path = Path(NGINX_KEY_PATH)
+    key_path.parent.mkdir(parents=True, exist_ok=True)
     
     # Write key only
-    key_path.write_text(key_value.decode())
-    key_path.chmod(0o600)
+    write_atomic(NGINX_KEY_PATH, key_value, 0o600)
     
     print(f"TLS key written to: {key_path}")
     
     return str(key_path)
 
+def write_cert_to_nginx(fullchain_content):
+    """Write a certificate chain to the nginx cert path; returns the path"""
+    cert_path = Path(NGINX_CERT_PATH)
+    cert_path.parent.mkdir(parents=True, exist_ok=True)
+    write_atomic(NGINX_CERT_PATH, fullchain_content.encode(), 0o644)
+    return cert_path
+
 def generate_csr(key_path, domains):
     """Generate a Certificate Signing Request using our existing private key"""
     primary_domain = domains[0]
@@ -234,13 +239,11 @@ def ensure_nginx_cert_from_etcd():
     if not cert_value:
         return False
     
-    cert_path = Path('/etc/nginx/ssl/cert.pem')
-    cert_path.parent.mkdir(parents=True, exist_ok=True)
+    cert_path = Path(NGINX_CERT_PATH)
     
     # Only write if it doesn't exist (don't overwrite Let's Encrypt certs)
     if not cert_path.exists():
-        cert_path.write_text(cert_value.decode())
-        cert_path.chmod(0o644)
+        write_cert_to_nginx(cert_value.decode())
         print(f"TLS certificate written to: {cert_path}")
     
     return True
@@ -249,13 +252,11 @@ def get_https_config():
     """Get HTTPS configuration from etcd"""
     client = get_etcd_client()
     
-    domain_key = '/cluster/https/domain'
-    aliases_key = '/cluster/https/aliases'
-    email_key = '/cluster/https/email'
-    
-    domain_value, _ = client.get(domain_key)
-    aliases_value, _ = client.get(aliases_key)
-    email_value, _ = client.get(email_key)
+    domain_value, aliases_value, email_value = get_many(client, [
+        '/cluster/https/domain',
+        '/cluster/https/aliases',
+        '/cluster/https/email'
+    ])
     
     config = {}
     
@@ -440,10 +441,7 @@ def obtain_certificate(test_cert=False, non_interactive=False, server=None):
             
             # Write certificate to nginx
             write_tls_key_to_nginx()
-            nginx_cert_path = Path('/etc/nginx/ssl/cert.pem')
-            nginx_cert_path.parent.mkdir(parents=True, exist_ok=True)
-            nginx_cert_path.write_text(fullchain_content)
-            nginx_cert_path.chmod(0o644)
+            nginx_cert_path = write_cert_to_nginx(fullchain_content)
             print(f"Certificate written to nginx: {nginx_cert_path}")
         finally:
             # Restart the fetch-tls-certs timer
@@ -557,10 +555,7 @@ def renew_certificates(non_interactive=False):
                     
                     # Write certificate to nginx
                     write_tls_key_to_nginx()
-                    nginx_cert_path = Path('/etc/nginx/ssl/cert.pem')
-                    nginx_cert_path.parent.mkdir(parents=True, exist_ok=True)
-                    nginx_cert_path.write_text(fullchain_content)
-                    nginx_cert_path.chmod(0o644)
+                    nginx_cert_path = write_cert_to_nginx(fullchain_content)
                     print(f"Renewed certificate written to nginx: {nginx_cert_path}")
                 finally:
                     # Restart the fetch-tls-certs timer
@@ -603,8 +598,8 @@ def store_cert_info(primary_domain, domains):
             'domains': domains,
             'cert_path': f'/etc/letsencrypt/live/{primary_domain}/fullchain.pem',
             'key_path': f'/etc/letsencrypt/live/{primary_domain}/privkey.pem',
-            'nginx_cert_path': '/etc/nginx/ssl/cert.pem',
-            'nginx_key_path': '/etc/nginx/ssl/key.pem',
+            'nginx_cert_path': NGINX_CERT_PATH,
+            'nginx_key_path': NGINX_KEY_PATH,
             'updated_at': subprocess.run(['date', '-Iseconds'], capture_output=True, text=True).stdout.strip()
         }
         
@@ -631,8 +626,7 @@ def list_certificates():
         
         # Check etcd for certificate
         client = get_etcd_client()
-        cert_value, _ = client.get('/cluster/tls/cert')
-        key_value, _ = client.get('/cluster/tls/key')
+        cert_value, key_value = get_many(client, ['/cluster/tls/cert', '/cluster/tls/key'])
         
         if cert_value and key_value:
             print("Certificate: Present in etcd")
@@ -713,7 +707,7 @@ def delete_certificate(domain):
         print("Certificate removed from etcd")
         
         # Remove nginx certificate file
-        nginx_cert_path = Path('/etc/nginx/ssl/cert.pem')
+        nginx_cert_path = Path(NGINX_CERT_PATH)
         if nginx_cert_path.exists():
             nginx_cert_path.unlink()
             print("Certificate removed from nginx")
@@ -3,24 +3,26 @@
 Scapy-based DHCP server with etcd integration for YCluster
 """
 
+import functools
 import os
 import sys
 import time
-import json
+import orjson
 import socket
 import threading
 import logging
 import subprocess
 import yaml
 from datetime import datetime, timedelta
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from etcd3.events import DeleteEvent
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from scapy.all import *
 from scapy.layers.dhcp import DHCP, BOOTP
 from scapy.layers.inet import IP, UDP
 from scapy.layers.l2 import Ether
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from ..common.etcd_utils import get_etcd_client, get_etcd_hosts
+from ..common.etcd_utils import EtcdPool, get_etcd_hosts
 
 # Configuration
 ETCD_PREFIX = '/cluster/dhcp'
@@ -29,6 +31,11 @@ GATEWAY = '10.0.0.254'
 DNS_SERVER = '10.0.0.254'
 NTP_SERVER = '10.0.0.254'
 HEALTH_PORT = int(os.environ.get('DHCP_HEALTH_PORT', '8067'))
+# Health, status and metrics requests within this many seconds share one
+# etcd reachability check
+ETCD_STATUS_TTL = 1
+# Health requests are served on their own threads, at most this many at once
+HEALTH_MAX_CONCURRENT = 4
 
 # IP allocation configuration (same as Flask app)
 IP_RANGES = {
@@ -40,10 +47,36 @@ IP_RANGES = {
     'x': {'base': 150, 'max': 49},   # Adhoc: 10.0.0.151-199 (x1-x49)
 }
 
+# Hostname prefix allocated for each node type (<prefix><n>, n from 1)
+NODE_TYPE_PREFIXES = {
+    'storage': 's',
+    'compute': 'c',
+    'macos': 'm',
+    'nvidia': 'nv',
+    'nas': 'nas',
+    'adhoc': 'x'
+}
+
+# Node type by a hostname's first letter, once the multi-char 'nas'/'nv'
+# prefixes have been ruled out; anything else is compute
+HOSTNAME_PREFIX_TYPES = {'s': 'storage', 'c': 'compute', 'm': 'macos', 'x': 'adhoc'}
+
 # Dynamic IP allocation range for auto-assigned hostnames
 DYNAMIC_IP_START = 200
 DYNAMIC_IP_END = 249
 
+NODES_BY_HOSTNAME_PREFIX = '/cluster/nodes/by-hostname/'
+
+# Leases moved per migration transaction: two ops each, which keeps a
+# batch within etcd's default --max-txn-ops of 128
+MIGRATION_BATCH = 64
+
+_MAC_SEPARATORS = str.maketrans('', '', ':-')
+
+def normalize_mac(mac_address):
+    """Lowercase a MAC address and strip ':'/'-' separators."""
+    return mac_address.translate(_MAC_SEPARATORS).lower()
+
 # Sentinel: an allocation attempt lost its etcd compare-and-swap race and
 # should be re-run from the top (re-check existing state, re-pick, re-commit).
 _ALLOC_RETRY = object()
@@ -55,12 +88,18 @@ logger = logging.getLogger(__name__)
 class HealthHandler(BaseHTTPRequestHandler):
     """HTTP handler for health monitoring"""
     
+    _slots = threading.BoundedSemaphore(HEALTH_MAX_CONCURRENT)
+    
     def __init__(self, dhcp_server, *args, **kwargs):
         self.dhcp_server = dhcp_server
         super().__init__(*args, **kwargs)
     
     def do_GET(self):
         """Handle GET requests for health checks"""
+        with self._slots:
+            self._route()
+    
+    def _route(self):
         if self.path == '/metrics':
             self._send_metrics_response()
         elif self.path == '/health':
@@ -76,7 +115,7 @@ class HealthHandler(BaseHTTPRequestHandler):
     
     def _health_data(self):
         """Get health check data"""
-        etcd_healthy = self.dhcp_server.get_etcd_client() is not None
+        etcd_healthy = self.dhcp_server.etcd_connected()
         
         if self.dhcp_server.running and etcd_healthy:
             return (200, {
@@ -102,20 +141,25 @@ class HealthHandler(BaseHTTPRequestHandler):
             'lease_count': len(self.dhcp_server.leases),
             'allocated_ips': len(self.dhcp_server.allocated_ips),
             'etcd_hosts': get_etcd_hosts(),
-            'etcd_connected': self.dhcp_server.get_etcd_client() is not None
+            'etcd_connected': self.dhcp_server.etcd_connected()
         })
     
+    @staticmethod
+    def _lease_view(lease):
+        """The lease fields /leases reports."""
+        return {
+            'ip': lease['ip'],
+            'hostname': lease.get('hostname', ''),
+            'expires': lease['expires'],
+            'allocated_at': lease.get('allocated_at', '')
+        }
+    
     def _leases_data(self):
         """Get lease data"""
-        leases_data = {
-            mac: {
-                'ip': lease['ip'],
-                'hostname': lease.get('hostname', ''),
-                'expires': lease['expires'],
-                'allocated_at': lease.get('allocated_at', '')
-            }
-            for mac, lease in self.dhcp_server.leases.items()
-        }
+        # The packet thread adds and drops leases while this runs; list()
+        # copies the items in one step so the dict can't change under us
+        leases = list(self.dhcp_server.leases.items())
+        leases_data = {mac: self._lease_view(lease) for mac, lease in leases}
         
         return (200, {
             'leases': leases_data,
@@ -140,7 +184,7 @@ class HealthHandler(BaseHTTPRequestHandler):
     
     def _generate_prometheus_metrics(self):
         """Generate Prometheus format metrics"""
-        etcd_healthy = self.dhcp_server.get_etcd_client() is not None
+        etcd_healthy = self.dhcp_server.etcd_connected()
         server_running = self.dhcp_server.running
         
         metrics = []
@@ -180,7 +224,7 @@ class HealthHandler(BaseHTTPRequestHandler):
             self.send_response(status_code)
             self.send_header('Content-Type', 'application/json')
             self.end_headers()
-            self.wfile.write(json.dumps(response_data).encode())
+            self.wfile.write(orjson.dumps(response_data))
         except Exception as e:
             self.send_response(500)
             self.send_header('Content-Type', 'application/json')
@@ -190,7 +234,7 @@ class HealthHandler(BaseHTTPRequestHandler):
                 'error': str(e),
                 'timestamp': datetime.now().isoformat()
             }
-            self.wfile.write(json.dumps(response).encode())
+            self.wfile.write(orjson.dumps(response))
     
     def log_message(self, format, *args):
         """Override to use our logger"""
@@ -209,7 +253,9 @@ class HealthServer:
         """Start the health monitoring server"""
         try:
             handler_class = lambda *args, **kwargs: HealthHandler(self.dhcp_server, *args, **kwargs)
-            self.server = HTTPServer(('0.0.0.0', self.port), handler_class)
+            # One thread per request, so a slow poll (e.g. an etcd check
+            # during an outage) doesn't hold up the others
+            self.server = ThreadingHTTPServer(('0.0.0.0', self.port), handler_class)
             self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
             self.thread.start()
             logger.info(f"Health monitoring server started on port {self.port}")
@@ -227,20 +273,48 @@ class DHCPServer:
     def __init__(self):
         self.leases = {}  # mac -> lease_info
         self.allocated_ips = set()
+        # Resolved once: neither changes while the server runs, and the
+        # interface lookup would otherwise scan every NIC per packet
         self.server_ip = self.get_server_ip()
+        self.interface = self.get_interface_for_ip(self.server_ip)
         self.running = False
         self.health_server = None
+        # Pooled clients: every RPC is bounded by the pool's timeout, and a
+        # client that failed is discarded so its member reconnects instead
+        # of the packet thread waiting on a dead channel
+        self.etcd_pool = EtcdPool()
+        self._etcd_status = (float('-inf'), False)  # (monotonic time, connected)
+        # Last octet of every node allocation's IP, keyed by etcd key; kept
+        # current by watch_node_allocations and only used while it is ready
+        self._node_octets = {}
+        self._node_octets_ready = False
+        self._node_octets_lock = threading.Lock()
 
     def get_etcd_client(self):
         """Get etcd client with failover"""
         try:
-            client = get_etcd_client()
+            client = self.etcd_pool.get()
             logger.debug("Connected to etcd")
             return client
         except Exception as e:
             logger.error(f"Could not connect to any etcd host: {e}")
             return None
     
+    def etcd_connected(self):
+        """Whether an etcd client is available, re-checked at most every
+        ETCD_STATUS_TTL seconds.
+
+        While every member is down, each check re-probes the endpoints, so
+        back-to-back health polls share the last answer.
+        """
+        checked_at, connected = self._etcd_status
+        now = time.monotonic()
+        if now - checked_at < ETCD_STATUS_TTL:
+            return connected
+        connected = self.get_etcd_client() is not None
+        self._etcd_status = (now, connected)
+        return connected
+    
     def get_server_ip(self):
         """Get the IP address of the DHCP server from netplan primary interface"""
         try:
@@ -267,7 +341,9 @@ class DHCPServer:
 
         raise ValueError("Could not determine server IP from netplan primary interface or hostname")
 
-    def determine_ip_from_hostname(self, hostname):
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def determine_ip_from_hostname(hostname):
         """Generate deterministic IP based on hostname (same logic as Flask app)"""
         if not hostname:
             return None
@@ -308,13 +384,15 @@ class DHCPServer:
             # Regular interface
             return f"10.0.0.{base_ip}"
     
-    def determine_type_from_mac(self, mac_address):
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def determine_type_from_mac(mac_address):
         """Determine machine type based on MAC address prefix (same logic as Flask app)"""
         if not mac_address:
             return 'compute'
         
         # Normalize MAC address to lowercase and remove separators
-        normalized_mac = mac_address.lower().replace(':', '').replace('-', '')
+        normalized_mac = normalize_mac(mac_address)
         
         # Check for storage prefix (58:47:ca becomes 5847ca)
         if normalized_mac.startswith('5847ca'):
@@ -323,7 +401,9 @@ class DHCPServer:
         # Default to compute
         return 'compute'
     
-    def determine_type_from_hostname(self, hostname):
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def determine_type_from_hostname(hostname):
         """Determine machine type from hostname prefix"""
         if not hostname:
             return 'compute'
@@ -334,34 +414,30 @@ class DHCPServer:
         if hostname.startswith('nv'):
             return 'nvidia'
         
-        prefix = hostname[0].lower()
-        if prefix == 's':
-            return 'storage'
-        elif prefix == 'c':
-            return 'compute'
-        elif prefix == 'm':
-            return 'macos'
-        elif prefix == 'x':
-            return 'adhoc'
-        else:
-            return 'compute'
+        return HOSTNAME_PREFIX_TYPES.get(hostname[0].lower(), 'compute')
     
+    @staticmethod
+    def _allocation_octet(value):
+        """Last octet of an allocation record's IP, or None if unparsable."""
+        try:
+            return int(orjson.loads(value)['ip'].split('.')[-1])
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return None
+
     def get_next_dynamic_ip(self):
         """Get the next available IP from the dynamic range 200-249"""
-        client = self.get_etcd_client()
-
-        # Get all allocated IPs from etcd nodes
-        allocated_ips = set()
-        for value, metadata in client.get_prefix(f"/cluster/nodes/by-hostname/"):
-            if value:
-                try:
-                    allocation = json.loads(value.decode())
-                    ip = allocation['ip']
-                    # Extract last octet
-                    last_octet = int(ip.split('.')[-1])
-                    allocated_ips.add(last_octet)
-                except:
-                    pass
+        # Allocated IPs from the watched mirror, or from etcd while it's down
+        with self._node_octets_lock:
+            allocated_ips = (set(self._node_octets.values())
+                             if self._node_octets_ready else None)
+        if allocated_ips is None:
+            client = self.get_etcd_client()
+            allocated_ips = set()
+            for value, metadata in client.get_prefix(NODES_BY_HOSTNAME_PREFIX):
+                if value:
+                    last_octet = self._allocation_octet(value)
+                    if last_octet is not None:
+                        allocated_ips.add(last_octet)
         
         # Also include currently leased IPs
         for lease in self.leases.values():
@@ -381,56 +457,37 @@ class DHCPServer:
 
     def get_next_hostname(self, node_type):
         """Get the next available hostname for a node type (same logic as Flask app)"""
-        prefixes = {
-            'storage': 's',
-            'compute': 'c',
-            'macos': 'm',
-            'nvidia': 'nv',
-            'nas': 'nas',
-            'adhoc': 'x'
-        }
-        
-        prefix = prefixes.get(node_type, 'c')
+        prefix = NODE_TYPE_PREFIXES.get(node_type, 'c')
         
         client = self.get_etcd_client()
         if not client:
             return f"{prefix}1"  # Fallback
         
         # Get all existing hostnames of this type from etcd nodes prefix
-        existing_numbers = []
+        existing_numbers = set()
         for value, metadata in client.get_prefix(f"/cluster/nodes/by-hostname/{prefix}"):
             if value:
                 hostname = metadata.key.decode().split('/')[-1]
                 try:
-                    num = int(hostname[len(prefix):])
-                    existing_numbers.append(num)
-                except:
+                    existing_numbers.add(int(hostname[len(prefix):]))
+                except ValueError:
                     pass
 
-        # Find the next available number
-        next_num = 1
-        if existing_numbers:
-            existing_numbers.sort()
-            # Find first gap or use max+1
-            for i, num in enumerate(existing_numbers):
-                if num != i + 1:
-                    next_num = i + 1
-                    break
-            else:
-                next_num = len(existing_numbers) + 1
+        # First unused number from 1; at most len+1 probes
+        next_num = next(i for i in range(1, len(existing_numbers) + 2)
+                        if i not in existing_numbers)
         
         return f"{prefix}{next_num}"
     
     @staticmethod
     def ip_to_int(ip):
         """Convert IP string to integer"""
-        parts = ip.split('.')
-        return (int(parts[0]) << 24) + (int(parts[1]) << 16) + (int(parts[2]) << 8) + int(parts[3])
+        return int.from_bytes(socket.inet_aton(ip), 'big')
     
     @staticmethod
     def int_to_ip(ip_int):
         """Convert integer to IP string"""
-        return f"{(ip_int >> 24) & 0xFF}.{(ip_int >> 16) & 0xFF}.{(ip_int >> 8) & 0xFF}.{ip_int & 0xFF}"
+        return socket.inet_ntoa(ip_int.to_bytes(4, 'big'))
     
     def allocate_hostname_and_ip(self, mac_address, requested_hostname=None):
         """Allocate hostname and IP using same logic as Flask app"""
@@ -448,7 +505,7 @@ class DHCPServer:
         """One allocation attempt: returns (hostname, ip), (None, None) on
         fatal error, or _ALLOC_RETRY on a lost etcd race."""
         # Normalize MAC address
-        normalized_mac = mac_address.lower().replace(':', '').replace('-', '')
+        normalized_mac = normalize_mac(mac_address)
         
         # Don't allocate AMT hostnames via DHCP - they are static only
         if requested_hostname and requested_hostname.endswith('a'):
@@ -461,13 +518,13 @@ class DHCPServer:
         
         # Check if this MAC address already has an allocation in etcd nodes
         existing_data = client.get(f"/cluster/nodes/by-mac/{normalized_mac}")
-        if existing_data[0]:
-            allocation = json.loads(existing_data[0].decode())
+        current_allocation = orjson.loads(existing_data[0]) if existing_data[0] else None
+        if current_allocation is not None:
             # If no hostname requested or same hostname, return existing
-            if not requested_hostname or allocation['hostname'] == requested_hostname:
-                return allocation['hostname'], allocation['ip']
+            if not requested_hostname or current_allocation['hostname'] == requested_hostname:
+                return current_allocation['hostname'], current_allocation['ip']
             # If different hostname requested, we need to reallocate
-            logger.info(f"Reallocating {mac_address} from {allocation['hostname']} to {requested_hostname}")
+            logger.info(f"Reallocating {mac_address} from {current_allocation['hostname']} to {requested_hostname}")
 
         hostname = None
         ip_address = None
@@ -485,7 +542,7 @@ class DHCPServer:
                 # Check if hostname is already taken by another MAC
                 existing_hostname_data = client.get(f"/cluster/nodes/by-hostname/{requested_hostname}")
                 if existing_hostname_data[0]:
-                    existing_allocation = json.loads(existing_hostname_data[0].decode())
+                    existing_allocation = orjson.loads(existing_hostname_data[0])
                     if existing_allocation['mac'] != normalized_mac:
                         logger.warning(f"Hostname {requested_hostname} already taken by {existing_allocation['mac']}")
                         # Fall back to auto-allocation
@@ -533,7 +590,7 @@ class DHCPServer:
         }
         
         # Store in etcd with both lookups (same as Flask app)
-        allocation_json = json.dumps(allocation)
+        allocation_json = orjson.dumps(allocation)
         
         try:
             # Compare-and-swap: the checks above are non-atomic with this
@@ -563,8 +620,8 @@ class DHCPServer:
             # Reallocation: retire the old hostname entry in the same
             # transaction (deleting it up front would orphan the record if
             # the writes then failed).
-            if existing_data[0]:
-                old_hostname = json.loads(existing_data[0].decode())['hostname']
+            if current_allocation is not None:
+                old_hostname = current_allocation['hostname']
                 if old_hostname != hostname:
                     success.append(client.transactions.delete(
                         f"/cluster/nodes/by-hostname/{old_hostname}"))
@@ -579,8 +636,59 @@ class DHCPServer:
             return hostname, ip_address
         except Exception as e:
             logger.error(f"Failed to store allocation in etcd: {e}")
+            self.etcd_pool.discard(client)
             return None, None
     
+    def watch_node_allocations(self):
+        """Mirror node allocation IPs from etcd for get_next_dynamic_ip.
+
+        Loads the by-hostname allocations, then applies watch events from
+        the revision right after the load. On any failure the mirror is
+        marked stale (allocations scan etcd meanwhile) and the load+watch
+        restarts.
+        """
+        while self.running:
+            client = None
+            cancel = None
+            try:
+                client = self.etcd_pool.get()
+                resp = client.get_prefix_response(NODES_BY_HOSTNAME_PREFIX)
+                snapshot = {}
+                for kv in resp.kvs:
+                    last_octet = self._allocation_octet(kv.value)
+                    if last_octet is not None:
+                        snapshot[kv.key] = last_octet
+                events, cancel = client.watch_prefix(
+                    NODES_BY_HOSTNAME_PREFIX, start_revision=resp.header.revision + 1)
+                with self._node_octets_lock:
+                    self._node_octets = snapshot
+                    self._node_octets_ready = True
+                logger.info(f"Watching {len(snapshot)} node allocations from revision "
+                            f"{resp.header.revision}")
+
+                for event in events:
+                    last_octet = (None if isinstance(event, DeleteEvent)
+                                  else self._allocation_octet(event.value))
+                    with self._node_octets_lock:
+                        if last_octet is None:
+                            self._node_octets.pop(event.key, None)
+                        else:
+                            self._node_octets[event.key] = last_octet
+                logger.warning("Node allocation watch ended, restarting")
+            except Exception as e:
+                logger.error(f"Node allocation watch failed, scanning etcd instead: {e}")
+
+            with self._node_octets_lock:
+                self._node_octets_ready = False
+            if cancel is not None:
+                try:
+                    cancel()
+                except Exception as e:
+                    logger.warning(f"Node allocation watch cancel failed: {e}")
+            if client is not None:
+                self.etcd_pool.discard(client)
+            time.sleep(5)
+
     def migrate_leases_to_normalized_mac(self):
         """Migrate existing leases to use normalized MAC addresses as keys"""
         client = self.get_etcd_client()
@@ -589,6 +697,7 @@ class DHCPServer:
         
         logger.info("Starting lease migration to normalized MAC addresses...")
         migrated_count = 0
+        batch = {}  # new key -> (old key, lease JSON)
         
         try:
             # Get all existing lease entries
@@ -597,7 +706,7 @@ class DHCPServer:
                     continue
                     
                 try:
-                    lease_data = json.loads(value.decode('utf-8'))
+                    lease_data = orjson.loads(value)
                     old_key = metadata.key.decode()
                     old_mac_key = old_key.split('/')[-1]  # Extract MAC from key
                     
@@ -608,26 +717,25 @@ class DHCPServer:
                         continue
                     
                     # Normalize the MAC address
-                    normalized_mac = mac_in_data.lower().replace(':', '').replace('-', '')
+                    normalized_mac = normalize_mac(mac_in_data)
                     new_key = f"{ETCD_PREFIX}/leases/{normalized_mac}"
                     
                     # Check if this lease needs migration
                     if old_mac_key == normalized_mac:
                         continue
 
-                    # Store lease with normalized MAC key
-                    client.put(new_key, json.dumps(lease_data))
+                    # A transaction may write each key once: if another old
+                    # key already maps here, commit that first (the later
+                    # lease wins, as with one-by-one writes)
+                    if new_key in batch or len(batch) >= MIGRATION_BATCH:
+                        migrated_count += self._commit_lease_migrations(client, batch)
+                    batch[new_key] = (old_key, orjson.dumps(lease_data))
                     
-                    # Delete old entry if it's different from new key
-                    if old_key != new_key:
-                        client.delete(old_key)
-                        logger.info(f"Migrated lease: {old_key} -> {new_key}")
-                        migrated_count += 1
-                    
-                except json.JSONDecodeError as e:
+                except orjson.JSONDecodeError as e:
                     logger.warning(f"Failed to parse lease data for {metadata.key.decode()}: {e}")
                 except Exception as e:
                     logger.error(f"Failed to migrate lease {metadata.key.decode()}: {e}")
+            migrated_count += self._commit_lease_migrations(client, batch)
             
             if migrated_count > 0:
                 logger.info(f"Successfully migrated {migrated_count} leases to normalized MAC format")
@@ -637,6 +745,28 @@ class DHCPServer:
         except Exception as e:
             logger.error(f"Failed to migrate leases: {e}")
 
+    def _commit_lease_migrations(self, client, batch):
+        """Move a batch of leases to their new keys in one transaction.
+
+        Empties batch; returns the number of leases moved.
+        """
+        if not batch:
+            return 0
+        ops = []
+        for new_key, (old_key, value) in batch.items():
+            ops.append(client.transactions.put(new_key, value))
+            ops.append(client.transactions.delete(old_key))
+        moved = [(old_key, new_key) for new_key, (old_key, _) in batch.items()]
+        batch.clear()
+        try:
+            client.transaction(compare=[], success=ops, failure=[])
+        except Exception as e:
+            logger.error(f"Failed to migrate leases {', '.join(old for old, _ in moved)}: {e}")
+            return 0
+        for old_key, new_key in moved:
+            logger.info(f"Migrated lease: {old_key} -> {new_key}")
+        return len(moved)
+
     def load_leases_from_etcd(self):
         """Load existing leases from etcd"""
         client = self.get_etcd_client()
@@ -645,7 +775,7 @@ class DHCPServer:
         
         try:
             for value, metadata in client.get_prefix(f"{ETCD_PREFIX}/leases/"):
-                lease_data = json.loads(value.decode('utf-8'))
+                lease_data = orjson.loads(value)
                 mac = lease_data['mac']
                 
                 # Ensure lease has required fields for new format
@@ -653,6 +783,15 @@ class DHCPServer:
                     # Legacy lease - add expires field
                     expires = datetime.now() + timedelta(seconds=LEASE_TIME)
                     lease_data['expires'] = expires.isoformat()
+                if 'expires_epoch' not in lease_data:
+                    # Written before expires_epoch existed: derive it once here
+                    # so expiry checks never parse the ISO string
+                    try:
+                        lease_data['expires_epoch'] = int(
+                            datetime.fromisoformat(lease_data['expires']).timestamp())
+                    except (TypeError, ValueError) as e:
+                        logger.warning(f"Lease {mac} has invalid expiry {lease_data['expires']!r}, skipping: {e}")
+                        continue
                 
                 if 'hostname' not in lease_data:
                     lease_data['hostname'] = ''
@@ -674,13 +813,23 @@ class DHCPServer:
         
         try:
             # Normalize MAC for etcd key
-            normalized_mac = mac.lower().replace(':', '').replace('-', '')
+            normalized_mac = normalize_mac(mac)
             key = f"{ETCD_PREFIX}/leases/{normalized_mac}"
-            client.put(key, json.dumps(lease_data))
+            # by-ip is the admin API's IP -> MAC index (get_mac_from_ip);
+            # write it with the lease so the two never disagree.
+            client.transaction(
+                compare=[],
+                success=[
+                    client.transactions.put(key, orjson.dumps(lease_data)),
+                    client.transactions.put(f"{ETCD_PREFIX}/by-ip/{lease_data['ip']}", mac)
+                ],
+                failure=[]
+            )
             logger.info(f"Saved lease to etcd: {mac} -> {lease_data['ip']}")
             return True
         except Exception as e:
             logger.error(f"Failed to save lease to etcd: {e}")
+            self.etcd_pool.discard(client)
             return False
     
     def get_or_create_lease(self, mac, requested_ip=None, requested_hostname=None):
@@ -689,8 +838,7 @@ class DHCPServer:
         if mac in self.leases:
             lease = self.leases[mac]
             # Check if lease is still valid
-            expires = datetime.fromisoformat(lease['expires'])
-            if expires > datetime.now():
+            if lease['expires_epoch'] > time.time():
                 # If hostname changed and it's not a temporary hostname, we need to reallocate
                 if requested_hostname and lease.get('hostname', '') != requested_hostname:
                     # Don't reallocate for temporary hostnames - preserve existing allocation
@@ -716,13 +864,14 @@ class DHCPServer:
             logger.error(f"No IP could be allocated for {mac}")
             return None, None
         
-        # Create new lease
-        expires = datetime.now() + timedelta(seconds=LEASE_TIME)
+        # Create new lease; expires is for display, expires_epoch for checks
+        expires_epoch = int(time.time()) + LEASE_TIME
         lease_data = {
             'mac': mac,
             'ip': ip,
             'hostname': hostname or '',
-            'expires': expires.isoformat(),
+            'expires': datetime.fromtimestamp(expires_epoch).isoformat(),
+            'expires_epoch': expires_epoch,
             'allocated_at': datetime.now().isoformat()
         }
         
@@ -732,20 +881,28 @@ class DHCPServer:
         
         return ip, hostname
     
+    @staticmethod
+    def _dhcp_options(packet, names):
+        """The packet's DHCP options among names, as {name: value}.
+
+        A hostname option is decoded to str.
+        """
+        if not packet.haslayer(DHCP):
+            return {}
+        options = {option[0]: option[1] for option in packet[DHCP].options
+                   if isinstance(option, tuple) and option[0] in names}
+        if isinstance(options.get('hostname'), bytes):
+            options['hostname'] = options['hostname'].decode()
+        return options
+
     def handle_dhcp_discover(self, packet):
         """Handle DHCP DISCOVER packet"""
         mac = packet[Ether].src
         
         # Get requested IP and hostname if present
-        requested_ip = None
-        requested_hostname = None
-        if packet.haslayer(DHCP):
-            for option in packet[DHCP].options:
-                if isinstance(option, tuple):
-                    if option[0] == 'requested_addr':
-                        requested_ip = option[1]
-                    elif option[0] == 'hostname':
-                        requested_hostname = option[1].decode() if isinstance(option[1], bytes) else option[1]
+        options = self._dhcp_options(packet, ('requested_addr', 'hostname'))
+        requested_ip = options.get('requested_addr')
+        requested_hostname = options.get('hostname')
         
         # Log with client-provided details
         client_details = []
@@ -763,8 +920,7 @@ class DHCPServer:
         
         # Create DHCP OFFER
         offer = self.create_dhcp_offer(packet, offered_ip, hostname)
-        interface = self.get_interface_for_ip(self.server_ip)
-        sendp(offer, iface=interface, verbose=0)
+        sendp(offer, iface=self.interface, verbose=0)
         logger.info(f"Sent DHCP OFFER {offered_ip} ({hostname}) to {mac}")
     
     def handle_dhcp_request(self, packet):
@@ -772,18 +928,10 @@ class DHCPServer:
         mac = packet[Ether].src
         
         # Get requested IP, hostname, and server ID
-        requested_ip = None
-        requested_hostname = None
-        server_id = None
-        if packet.haslayer(DHCP):
-            for option in packet[DHCP].options:
-                if isinstance(option, tuple):
-                    if option[0] == 'requested_addr':
-                        requested_ip = option[1]
-                    elif option[0] == 'hostname':
-                        requested_hostname = option[1].decode() if isinstance(option[1], bytes) else option[1]
-                    elif option[0] == 'server_id':
-                        server_id = option[1]
+        options = self._dhcp_options(packet, ('requested_addr', 'hostname', 'server_id'))
+        requested_ip = options.get('requested_addr')
+        requested_hostname = options.get('hostname')
+        server_id = options.get('server_id')
         
         # If no requested_addr option, fall back to ciaddr (used in renewals per RFC 2131)
         if not requested_ip and packet.haslayer(BOOTP):
@@ -840,14 +988,12 @@ class DHCPServer:
             # Send ACK
             hostname = self.leases[mac].get('hostname', '')
             ack = self.create_dhcp_ack(packet, requested_ip, hostname)
-            interface = self.get_interface_for_ip(self.server_ip)
-            sendp(ack, iface=interface, verbose=0)
+            sendp(ack, iface=self.interface, verbose=0)
             logger.info(f"Sent DHCP ACK {requested_ip} ({hostname}) to {mac}")
         else:
             # Send NAK
             nak = self.create_dhcp_nak(packet)
-            interface = self.get_interface_for_ip(self.server_ip)
-            sendp(nak, iface=interface, verbose=0)
+            sendp(nak, iface=self.interface, verbose=0)
             if mac not in self.leases:
                 reason = "no lease found"
             elif requested_ip is None:
@@ -890,11 +1036,10 @@ class DHCPServer:
 
     def create_dhcp_offer(self, request_packet, offered_ip, hostname=''):
         """Create DHCP OFFER packet"""
-        interface = self.get_interface_for_ip(self.server_ip)
         options = self.build_dhcp_options(2, hostname)  # OFFER = 2
         
         return (
-            Ether(dst=request_packet[Ether].src, src=get_if_hwaddr(interface)) /
+            Ether(dst=request_packet[Ether].src, src=get_if_hwaddr(self.interface)) /
             IP(src=self.server_ip, dst='255.255.255.255') /
             UDP(sport=67, dport=68) /
             BOOTP(
@@ -911,11 +1056,10 @@ class DHCPServer:
     
     def create_dhcp_ack(self, request_packet, ack_ip, hostname=''):
         """Create DHCP ACK packet"""
-        interface = self.get_interface_for_ip(self.server_ip)
         options = self.build_dhcp_options(5, hostname)  # ACK = 5
         
         return (
-            Ether(dst=request_packet[Ether].src, src=get_if_hwaddr(interface)) /
+            Ether(dst=request_packet[Ether].src, src=get_if_hwaddr(self.interface)) /
             IP(src=self.server_ip, dst='255.255.255.255') /
             UDP(sport=67, dport=68) /
             BOOTP(
@@ -932,9 +1076,8 @@ class DHCPServer:
     
     def create_dhcp_nak(self, request_packet):
         """Create DHCP NAK packet"""
-        interface = self.get_interface_for_ip(self.server_ip)
         return (
-            Ether(dst=request_packet[Ether].src, src=get_if_hwaddr(interface)) /
+            Ether(dst=request_packet[Ether].src, src=get_if_hwaddr(self.interface)) /
             IP(src=self.server_ip, dst='255.255.255.255') /
             UDP(sport=67, dport=68) /
             BOOTP(
@@ -972,6 +1115,7 @@ class DHCPServer:
         while self.running:
             try:
                 now = datetime.now()
+                now_epoch = now.timestamp()
                 expired_macs = []
                 
                 for mac, lease in self.leases.items():
@@ -981,14 +1125,14 @@ class DHCPServer:
                         # Convert to new format with current time + lease duration
                         expires = now + timedelta(seconds=LEASE_TIME)
                         lease['expires'] = expires.isoformat()
+                        lease['expires_epoch'] = int(expires.timestamp())
                         lease['hostname'] = lease.get('hostname', '')
                         lease['allocated_at'] = lease.get('allocated_at', now.isoformat())
                         # Save updated lease
                         self.save_lease_to_etcd(mac, lease)
                         continue
                     
-                    expires = datetime.fromisoformat(lease['expires'])
-                    if expires <= now:
+                    if lease['expires_epoch'] <= now_epoch:
                         expired_macs.append(mac)
                 
                 for mac in expired_macs:
@@ -1021,11 +1165,13 @@ class DHCPServer:
         cleanup_thread = threading.Thread(target=self.cleanup_expired_leases, daemon=True)
         cleanup_thread.start()
         
+        # Start node allocation watch
+        threading.Thread(target=self.watch_node_allocations, daemon=True).start()
+        
         # Start packet sniffing
-        interface = self.get_interface_for_ip(self.server_ip)
-        logger.info(f"DHCP server listening on {interface} ({self.server_ip})")
+        logger.info(f"DHCP server listening on {self.interface} ({self.server_ip})")
         sniff(
-            iface=interface,
+            iface=self.interface,
             filter="udp and port 67",
             prn=self.dhcp_packet_handler,
             store=0
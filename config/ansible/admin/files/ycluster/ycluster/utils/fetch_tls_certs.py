@@ -3,9 +3,48 @@
 Script to fetch TLS certificates from etcd and write them to nginx SSL directory
 """
 
+import mmap
+import os
 import sys
+import tempfile
 
-from ..common.etcd_utils import get_etcd_client
+from ..common.etcd_utils import get_etcd_client, get_many
+
+NGINX_CERT_PATH = '/etc/nginx/ssl/cert.pem'
+NGINX_KEY_PATH = '/etc/nginx/ssl/key.pem'
+
+def file_matches(path, content):
+    """True if the file at path holds exactly content (bytes).
+
+    Compared through a read-only mapping, so the file isn't copied into
+    memory and the comparison stops at the first differing byte.
+    """
+    try:
+        if os.stat(path).st_size != len(content):
+            return False
+        if not content:
+            return True  # can't mmap an empty file
+        with open(path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+                memoryview(mm) as view:
+            return view == content
+    except FileNotFoundError:
+        return False
+
+def write_atomic(path, content, mode):
+    """Replace path with content via a temp file in the same directory, so
+    nginx never loads a half-written PEM."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            os.fchmod(f.fileno(), mode)
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
 
 def main():
     try:
@@ -14,42 +53,23 @@ def main():
         print(f'Could not connect to etcd: {e}')
         sys.exit(1)
     
-    cert_value, _ = client.get('/cluster/tls/cert')
-    key_value, _ = client.get('/cluster/tls/key')
+    cert_value, key_value = get_many(client, ['/cluster/tls/cert', '/cluster/tls/key'])
     
     if cert_value and key_value:
-        cert_content = cert_value.decode()
-        key_content = key_value.decode()
-        
-        cert_path = '/etc/nginx/ssl/cert.pem'
-        key_path = '/etc/nginx/ssl/key.pem'
-        
-        # Check if files exist and compare content
-        cert_changed = True
-        key_changed = True
-        
-        try:
-            with open(cert_path, 'r') as f:
-                existing_cert = f.read()
-            cert_changed = existing_cert != cert_content
-        except FileNotFoundError:
-            pass  # File doesn't exist, so it's a change
+        cert_path = NGINX_CERT_PATH
+        key_path = NGINX_KEY_PATH
         
-        try:
-            with open(key_path, 'r') as f:
-                existing_key = f.read()
-            key_changed = existing_key != key_content
-        except FileNotFoundError:
-            pass  # File doesn't exist, so it's a change
+        # Only write what has changed
+        cert_changed = not file_matches(cert_path, cert_value)
+        key_changed = not file_matches(key_path, key_value)
         
-        # Only write if content has changed
+        # Each file is swapped in whole; nginx is reloaded once after both
+        # (ExecStartPost of fetch-tls-certs.service).
         if cert_changed:
-            with open(cert_path, 'w') as f:
-                f.write(cert_content)
+            write_atomic(cert_path, cert_value, 0o644)
         
         if key_changed:
-            with open(key_path, 'w') as f:
-                f.write(key_content)
+            write_atomic(key_path, key_value, 0o600)
         
         if cert_changed or key_changed:
             print('Certificates updated')
@@ -35,11 +35,25 @@ def set_host_disabled(hostname, disabled):
 def set_drain(hostname, drain):
     """Set or clear the leader-election drain flag for a node.
 
-    Raises KeyError if the hostname has no allocation.
+    Returns False if the node was already in the requested state, in which
+    case nothing is written. Raises KeyError if the hostname has no
+    allocation.
     """
     client = get_etcd_client()
     _get_allocation(client, hostname)
+    key = f"{ETCD_PREFIX}/{hostname}/drain"
+    # Check and write in one transaction: concurrent drains of the same
+    # node can't interleave, and a repeat is a read rather than a write.
     if drain:
-        client.put(f"{ETCD_PREFIX}/{hostname}/drain", 'true')
+        already, _ = client.transaction(
+            compare=[client.transactions.value(key) == 'true'],
+            success=[],
+            failure=[client.transactions.put(key, 'true')]
+        )
     else:
-        client.delete(f"{ETCD_PREFIX}/{hostname}/drain")
+        already, _ = client.transaction(
+            compare=[client.transactions.version(key) == 0],
+            success=[],
+            failure=[client.transactions.delete(key)]
+        )
+    return not already
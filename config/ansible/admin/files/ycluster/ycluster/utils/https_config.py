@@ -3,36 +3,37 @@
 Script to manage HTTPS domain configuration in etcd
 """
 
-import json
+import orjson
 import sys
 import argparse
 
-from ..common.etcd_utils import get_etcd_client
+from ..common.etcd_utils import get_etcd_client, get_many
+
+def _decode_aliases(value):
+    """Alias list stored in value ([] if unset or corrupt)."""
+    if value:
+        try:
+            return orjson.loads(value)
+        except orjson.JSONDecodeError:
+            pass
+    return []
 
 def get_https_config():
     """Get HTTPS configuration from etcd"""
     client = get_etcd_client()
     
-    domain_key = '/cluster/https/domain'
-    aliases_key = '/cluster/https/aliases'
-    email_key = '/cluster/https/email'
-    
-    domain_value, _ = client.get(domain_key)
-    aliases_value, _ = client.get(aliases_key)
-    email_value, _ = client.get(email_key)
+    domain_value, aliases_value, email_value = get_many(client, [
+        '/cluster/https/domain',
+        '/cluster/https/aliases',
+        '/cluster/https/email'
+    ])
     
     config = {}
     
     if domain_value:
         config['domain'] = domain_value.decode().strip()
     
-    if aliases_value:
-        try:
-            config['aliases'] = json.loads(aliases_value.decode())
-        except json.JSONDecodeError:
-            config['aliases'] = []
-    else:
-        config['aliases'] = []
+    config['aliases'] = _decode_aliases(aliases_value)
     
     if email_value:
         config['email'] = email_value.decode().strip()
@@ -46,46 +47,58 @@ def set_domain(domain):
     client.put(key, domain)
     print(f"Set primary domain: {domain}")
 
-def add_alias(alias):
-    """Add domain alias to etcd"""
+def _update_aliases(update):
+    """Edit the alias list in place with update(aliases), which returns
+    whether it changed anything; returns the same.
+
+    The write is a compare-and-swap on the key's revision, retried if
+    another writer got in between, so concurrent edits aren't lost.
+    """
     client = get_etcd_client()
     key = '/cluster/https/aliases'
     
-    # Get existing aliases
-    value, _ = client.get(key)
-    if value:
-        try:
-            aliases = json.loads(value.decode())
-        except json.JSONDecodeError:
+    while True:
+        value, meta = client.get(key)
+        if meta is None:
             aliases = []
-    else:
-        aliases = []
-    
-    if alias not in aliases:
+            unchanged = client.transactions.version(key) == 0
+        else:
+            aliases = _decode_aliases(value)
+            unchanged = client.transactions.mod(key) == meta.mod_revision
+        
+        changed = update(aliases)
+        if not changed:
+            return False
+        succeeded, _ = client.transaction(
+            compare=[unchanged],
+            success=[client.transactions.put(key, orjson.dumps(aliases))],
+            failure=[]
+        )
+        if succeeded:
+            return True
+
+def add_alias(alias):
+    """Add domain alias to etcd"""
+    def add(aliases):
+        if alias in aliases:
+            return False
         aliases.append(alias)
-        client.put(key, json.dumps(aliases))
+        return True
+    
+    if _update_aliases(add):
         print(f"Added alias: {alias}")
     else:
         print(f"Alias already exists: {alias}")
 
 def remove_alias(alias):
     """Remove domain alias from etcd"""
-    client = get_etcd_client()
-    key = '/cluster/https/aliases'
-    
-    # Get existing aliases
-    value, _ = client.get(key)
-    if value:
-        try:
-            aliases = json.loads(value.decode())
-        except json.JSONDecodeError:
-            aliases = []
-    else:
-        aliases = []
-    
-    if alias in aliases:
+    def remove(aliases):
+        if alias not in aliases:
+            return False
         aliases.remove(alias)
-        client.put(key, json.dumps(aliases))
+        return True
+    
+    if _update_aliases(remove):
         print(f"Removed alias: {alias}")
     else:
         print(f"Alias not found: {alias}")
@@ -97,9 +110,14 @@ def set_email(email):
     client.put(key, email)
     print(f"Set email: {email}")
 
-def get_all_domains():
-    """Get all domains (primary + aliases) as a list"""
-    config = get_https_config()
+def get_all_domains(config=None):
+    """Get all domains (primary + aliases) as a list
+
+    Pass config when the caller already has get_https_config()'s result,
+    to save re-reading it from etcd.
+    """
+    if config is None:
+        config = get_https_config()
     domains = []
     
     if 'domain' in config:
@@ -183,7 +201,7 @@ def main():
                 if 'email' in config:
                     print(f"Email: {config['email']}")
                 
-                all_domains = get_all_domains()
+                all_domains = get_all_domains(config)
                 if all_domains:
                     print(f"All domains: {', '.join(all_domains)}")
             else:
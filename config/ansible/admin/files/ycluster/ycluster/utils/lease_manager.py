@@ -4,12 +4,76 @@ DHCP Lease Manager - List and delete lease data from etcd
 """
 
 import os
+import re
 import sys
-import json
+import orjson
 import argparse
 from datetime import datetime
 
-from ..common.etcd_utils import get_etcd_client
+from ..common.etcd_utils import get_etcd_client, get_many, iter_prefix
+
+_MAC_RE = re.compile(r'(?:[0-9a-f]{2}[:-]?){5}[0-9a-f]{2}', re.I)
+
+def is_mac_address(target):
+    """True if target is a MAC address (colons, dashes or bare hex)."""
+    return _MAC_RE.fullmatch(target) is not None
+
+def _lease_key(normalized_mac):
+    return f"/cluster/dhcp/leases/{normalized_mac}"
+
+def _allocation_keys(hostname, normalized_mac):
+    """The by-hostname and by-mac keys of a node allocation."""
+    return [
+        f"/cluster/nodes/by-hostname/{hostname}",
+        f"/cluster/nodes/by-mac/{normalized_mac}"
+    ]
+
+def _delete_with_lease(client, keys, normalized_mac, lease_value):
+    """Delete keys plus the MAC's lease in one transaction.
+
+    lease_value is the lease as last read (None if there is none); the
+    lease's by-ip index entry goes too while it still points at this MAC
+    (the IP may have been re-leased since). Returns {key: existed} for
+    keys and the lease key, in that order. A lease that can't be decoded
+    is still deleted, just without its by-ip entry.
+    """
+    keys = keys + [_lease_key(normalized_mac)]
+    deletes = [client.transactions.delete(key) for key in keys]
+    compare = []
+    index_deletes = []
+    lease = None
+    if lease_value:
+        try:
+            lease = orjson.loads(lease_value)
+        except orjson.JSONDecodeError:
+            pass
+    if isinstance(lease, dict):
+        index_key = f"/cluster/dhcp/by-ip/{lease.get('ip')}"
+        compare = [client.transactions.value(index_key) == lease.get('mac', '')]
+        index_deletes = [client.transactions.delete(index_key)]
+    _, responses = client.transaction(
+        compare=compare,
+        success=deletes + index_deletes,
+        failure=deletes
+    )
+    return {key: response.response_delete_range.deleted > 0
+            for key, response in zip(keys, responses)}
+
+# Listing rows are collected and written FLUSH_ROWS at a time rather
+# than printed one by one
+ALLOCATION_ROW = "{:<15} {:<8} {:<15} {:<17} {}".format
+LEASE_ROW = "{:<17} {:<15} {:<15} {:<19} {}".format
+FLUSH_ROWS = 256
+
+# Lease expiry as the DHCP server writes it: naive local datetime.isoformat()
+# output, which orders as a string the same way it does as a datetime
+_LEASE_EXPIRES_RE = re.compile(r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?')
+
+def _write_rows(rows):
+    """Write buffered lines to stdout and empty the buffer."""
+    if rows:
+        sys.stdout.write('\n'.join(rows) + '\n')
+        rows.clear()
 
 def list_allocations():
     """List all node allocations from etcd"""
@@ -20,39 +84,43 @@ def list_allocations():
         return
     
     print("\n=== Node Allocations ===")
-    allocations = []
-    
-    # Get all allocations by hostname
-    for value, metadata in client.get_prefix("/cluster/nodes/by-hostname/"):
-        if value:
-            try:
-                allocation = json.loads(value.decode())
-                hostname = metadata.key.decode().split('/')[-1]
-                allocations.append((hostname, allocation))
-            except Exception as e:
-                print(f"Error parsing allocation: {e}")
-    
-    # Sort by hostname
-    allocations.sort(key=lambda x: x[0])
+    found = False
+    rows = []
     
-    if not allocations:
-        print("No allocations found")
-        return
-    
-    print(f"{'Hostname':<15} {'Type':<8} {'IP':<15} {'MAC':<17} {'Allocated At'}")
-    print("-" * 80)
-    
-    for hostname, allocation in allocations:
-        allocated_at = allocation.get('allocated_at', 'Unknown')
+    # Allocations by hostname arrive sorted by key, i.e. by hostname
+    for value, metadata in iter_prefix(client, "/cluster/nodes/by-hostname/"):
+        if not value:
+            continue
+        try:
+            allocation = orjson.loads(value)
+            hostname = metadata.key.decode().split('/')[-1]
+        except Exception as e:
+            rows.append(f"Error parsing allocation: {e}")
+            continue
+        
+        if not found:
+            found = True
+            rows.append(ALLOCATION_ROW('Hostname', 'Type', 'IP', 'MAC', 'Allocated At'))
+            rows.append("-" * 80)
+        
+        get = allocation.get
+        allocated_at = get('allocated_at', 'Unknown')
         if allocated_at != 'Unknown':
             try:
                 # Parse and format timestamp
                 dt = datetime.fromisoformat(allocated_at.replace('Z', '+00:00'))
                 allocated_at = dt.strftime('%Y-%m-%d %H:%M:%S')
-            except:
+            except ValueError:
                 pass
         
-        print(f"{hostname:<15} {allocation.get('type', 'unknown'):<8} {allocation.get('ip', 'unknown'):<15} {allocation.get('mac', 'unknown'):<17} {allocated_at}")
+        rows.append(ALLOCATION_ROW(hostname, get('type', 'unknown'), get('ip', 'unknown'),
+                                   get('mac', 'unknown'), allocated_at))
+        if len(rows) >= FLUSH_ROWS:
+            _write_rows(rows)
+    
+    _write_rows(rows)
+    if not found:
+        print("No allocations found")
 
 def list_leases():
     """List all DHCP leases from etcd"""
@@ -63,47 +131,55 @@ def list_leases():
         return
     
     print("\n=== DHCP Leases ===")
-    leases = []
-    
-    # Get all leases
-    for value, metadata in client.get_prefix("/cluster/dhcp/leases/"):
-        if value:
-            try:
-                lease = json.loads(value.decode())
-                mac = metadata.key.decode().split('/')[-1]
-                leases.append((mac, lease))
-            except Exception as e:
-                print(f"Error parsing lease: {e}")
+    found = False
+    rows = []
     
-    # Sort by MAC
-    leases.sort(key=lambda x: x[0])
-    
-    if not leases:
-        print("No leases found")
-        return
-    
-    print(f"{'MAC Address':<17} {'IP':<15} {'Hostname':<15} {'Expires':<19} {'Status'}")
-    print("-" * 85)
-    
-    now = datetime.now()
-    for mac_key, lease in leases:
-        expires_str = lease.get('expires', 'Unknown')
-        status = 'Unknown'
+    # Leases arrive sorted by key, i.e. by normalized MAC
+    now_iso = datetime.now().isoformat(timespec='seconds')
+    for value, metadata in iter_prefix(client, "/cluster/dhcp/leases/"):
+        if not value:
+            continue
+        try:
+            lease = orjson.loads(value)
+            mac_key = metadata.key.decode().split('/')[-1]
+        except Exception as e:
+            rows.append(f"Error parsing lease: {e}")
+            continue
         
-        if expires_str != 'Unknown':
-            try:
-                expires = datetime.fromisoformat(expires_str)
-                expires_str = expires.strftime('%Y-%m-%d %H:%M:%S')
-                status = 'Active' if expires > now else 'Expired'
-            except:
-                pass
+        if not found:
+            found = True
+            rows.append(LEASE_ROW('MAC Address', 'IP', 'Hostname', 'Expires', 'Status'))
+            rows.append("-" * 85)
         
-        hostname = lease.get('hostname', '')
-        ip = lease.get('ip', 'unknown')
+        get = lease.get
+        expires_str = get('expires', 'Unknown')
+        status = 'Unknown'
+        
+        if _LEASE_EXPIRES_RE.fullmatch(expires_str):
+            status = 'Active' if expires_str > now_iso else 'Expired'
+            expires_str = expires_str[:19].replace('T', ' ')
         
         # Display the MAC from lease data (with colons) if available, otherwise use key
-        display_mac = lease.get('mac', mac_key)
-        print(f"{display_mac:<17} {ip:<15} {hostname:<15} {expires_str:<19} {status}")
+        rows.append(LEASE_ROW(get('mac', mac_key), get('ip', 'unknown'), get('hostname', ''),
+                              expires_str, status))
+        if len(rows) >= FLUSH_ROWS:
+            _write_rows(rows)
+    
+    _write_rows(rows)
+    if not found:
+        print("No leases found")
+
+def _delete_keys(client, keys_to_delete, normalized_mac, lease_value):
+    """Delete allocation keys plus the MAC's lease; returns the count deleted."""
+    deleted_count = 0
+    deleted = _delete_with_lease(client, keys_to_delete, normalized_mac, lease_value)
+    for key, existed in deleted.items():
+        if existed:
+            print(f"Deleted: {key}")
+            deleted_count += 1
+        else:
+            print(f"Not found: {key}")
+    return deleted_count
 
 def delete_by_hostname(hostname):
     """Delete all etcd entries related to a hostname"""
@@ -122,7 +198,7 @@ def delete_by_hostname(hostname):
         return False
     
     try:
-        allocation = json.loads(allocation_data[0].decode())
+        allocation = orjson.loads(allocation_data[0])
         mac = allocation['mac']
         # Normalize MAC to lowercase without separators for etcd keys
         normalized_mac = mac.lower().replace(':', '').replace('-', '')
@@ -130,24 +206,10 @@ def delete_by_hostname(hostname):
         
         print(f"Found allocation: {hostname} -> {ip} (MAC: {mac})")
         
-        keys_to_delete = [
-            f"/cluster/nodes/by-hostname/{hostname}",
-            f"/cluster/nodes/by-mac/{normalized_mac}",
-            f"/cluster/dhcp/leases/{normalized_mac}"
-        ]
-        
-        deleted_count = 0
-        for key in keys_to_delete:
-            try:
-                result = client.delete(key)
-                if result:
-                    print(f"Deleted: {key}")
-                    deleted_count += 1
-                else:
-                    print(f"Not found: {key}")
-            except Exception as e:
-                print(f"Error deleting {key}: {e}")
-        
+        lease_value, _ = client.get(_lease_key(normalized_mac))
+        deleted_count = _delete_keys(client, _allocation_keys(hostname, normalized_mac),
+                                     normalized_mac, lease_value)
+
         print(f"Successfully deleted {deleted_count} entries for {hostname}")
         return deleted_count > 0
         
@@ -168,14 +230,15 @@ def delete_by_mac(mac):
     
     print(f"Deleting all entries for MAC: {mac} (normalized: {normalized_mac})")
     
-    # Get the allocation to find the hostname
-    allocation_data = client.get(f"/cluster/nodes/by-mac/{normalized_mac}")
-    if not allocation_data[0]:
+    # Read the allocation (to find the hostname) and the lease together
+    allocation_value, lease_value = get_many(
+        client, [f"/cluster/nodes/by-mac/{normalized_mac}", _lease_key(normalized_mac)])
+    if not allocation_value:
         print(f"No allocation found for MAC: {mac}")
         # Still try to delete lease entry using normalized MAC
         try:
-            result = client.delete(f"/cluster/dhcp/leases/{normalized_mac}")
-            if result:
+            deleted = _delete_with_lease(client, [], normalized_mac, lease_value)
+            if any(deleted.values()):
                 print(f"Deleted lease entry for MAC: {mac}")
                 return True
             else:
@@ -186,31 +249,16 @@ def delete_by_mac(mac):
             return False
     
     try:
-        allocation = json.loads(allocation_data[0].decode())
+        allocation = orjson.loads(allocation_value)
         hostname = allocation['hostname']
         ip = allocation['ip']
         
         print(f"Found allocation: {hostname} -> {ip} (MAC: {mac})")
         
         # Delete all related entries
-        keys_to_delete = [
-            f"/cluster/nodes/by-hostname/{hostname}",
-            f"/cluster/nodes/by-mac/{normalized_mac}",
-            f"/cluster/dhcp/leases/{normalized_mac}"
-        ]
-        
-        deleted_count = 0
-        for key in keys_to_delete:
-            try:
-                result = client.delete(key)
-                if result:
-                    print(f"Deleted: {key}")
-                    deleted_count += 1
-                else:
-                    print(f"Not found: {key}")
-            except Exception as e:
-                print(f"Error deleting {key}: {e}")
-        
+        deleted_count = _delete_keys(client, _allocation_keys(hostname, normalized_mac),
+                                     normalized_mac, lease_value)
+
         print(f"Successfully deleted {deleted_count} entries for MAC {mac}")
         return deleted_count > 0
         
@@ -251,8 +299,7 @@ def main():
     elif args.command == 'delete':
         # Auto-detect if target is hostname or MAC address
         target = args.target
-        if ':' in target or len(target.replace(':', '').replace('-', '')) == 12:
-            # Looks like a MAC address
+        if is_mac_address(target):
             success = delete_by_mac(target)
         else:
             # Assume it's a hostname
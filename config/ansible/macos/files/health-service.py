@@ -17,6 +17,10 @@ import os
 
 app = Flask(__name__)
 
+# Fixed for the life of the service; looked up once instead of per request.
+LOCAL_HOSTNAME = platform.node()
+LOCAL_PLATFORM = platform.platform()
+
 def check_service_status(service_name):
     """Check if a launchd service is running on macOS"""
     try:
@@ -341,8 +345,8 @@ def health():
         'overall': 'healthy',
         'services': {},
         'node_type': 'macos',
-        'hostname': platform.node(),
-        'platform': platform.platform()
+        'hostname': LOCAL_HOSTNAME,
+        'platform': LOCAL_PLATFORM
     }
     
     # Check NTP
@@ -402,7 +406,7 @@ def ping():
     """Simple ping endpoint for connectivity testing"""
     return jsonify({
         'status': 'ok', 
-        'hostname': platform.node(),
+        'hostname': LOCAL_HOSTNAME,
         'timestamp': datetime.now(timezone.utc).isoformat()
     })
 
@@ -412,5 +416,5 @@ def get_time():
     return jsonify({'timestamp': time.time()})
 
 if __name__ == '__main__':
-    print(f"Starting macOS health service on {platform.node()}")
+    print(f"Starting macOS health service on {LOCAL_HOSTNAME}")
     app.run(host='0.0.0.0', port=12723)